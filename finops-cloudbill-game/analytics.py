@@ -0,0 +1,251 @@
+"""Item-difficulty analytics for the CloudBill game.
+
+Every graded submission is appended to a JSONL results log and folded into
+per-item counters as it arrives: attempts, correct answers and a confusion
+matrix (correct answer x player answer) for both steps. Items are keyed by
+``(bill_id, item_id)``, since generated bills reuse item ids for unrelated
+items. Counters live in NumPy arrays indexed by that key and are snapshotted to a compact ``.npz``
+file together with the log offset they cover, so a restart loads the
+snapshot and only replays the tail of the log. Queries are O(items).
+A directory is meant to have a single writer process.
+
+Usage:
+    python analytics.py report --top 10
+"""
+import argparse
+import atexit
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from scoring import CATEGORIES, MISSING, OPTIMIZATIONS, BillColumns
+
+DEFAULT_ANALYTICS_DIR = os.environ.get(
+    "CLOUDBILL_ANALYTICS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "analytics"),
+)
+SNAPSHOT_EVERY = 500
+
+# step -> answer vocabulary; the extra last column counts missing answers
+STEPS = {"categories": CATEGORIES, "optimizations": OPTIMIZATIONS}
+
+
+class ItemStats:
+    """Append-only results log plus incrementally maintained per-item counters"""
+
+    def __init__(self, directory=DEFAULT_ANALYTICS_DIR, snapshot_every=SNAPSHOT_EVERY):
+        self.directory = directory
+        self.log_path = os.path.join(directory, "results.jsonl")
+        self.snapshot_path = os.path.join(directory, "item_stats.npz")
+        self.snapshot_every = snapshot_every
+        self._lock = threading.Lock()
+        self._index = {}
+        self._ids = []  # (bill_id, item_id) per counter row
+        self._attempts = {step: np.zeros(0, dtype=np.int64) for step in STEPS}
+        self._confusion = {
+            step: np.zeros((0, len(vocab), len(vocab) + 1), dtype=np.int64) for step, vocab in STEPS.items()
+        }
+        self._log_offset = 0
+        self._unsnapshotted = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # -- recording -----------------------------------------------------------
+
+    def record_categories(self, bill, user_categories):
+        """Record one categorization submission"""
+        columns = BillColumns.from_bill(bill)
+        self._record(bill["bill_id"], "categories", columns.ids,
+                     columns.encode_categories(user_categories), columns.category_answer)
+
+    def record_optimizations(self, bill, user_optimizations):
+        """Record one optimization submission"""
+        columns = BillColumns.from_bill(bill)
+        self._record(bill["bill_id"], "optimizations", columns.ids,
+                     columns.encode_optimizations(user_optimizations), columns.optimization_answer)
+
+    def _record(self, bill_id, step, ids, user_codes, answer_codes):
+        record = {
+            "t": round(time.time(), 3),
+            "bill_id": bill_id,
+            "step": step,
+            "ids": ids,
+            "user": user_codes.tolist(),
+            "answer": answer_codes.tolist(),
+        }
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            with open(self.log_path, "a") as f:
+                f.write(line)
+            self._log_offset += len(line.encode())
+            self._apply(step, bill_id, ids, user_codes, answer_codes)
+            self._unsnapshotted += 1
+            if self._unsnapshotted >= self.snapshot_every:
+                self._snapshot()
+
+    def _apply(self, step, bill_id, ids, user_codes, answer_codes):
+        rows = np.fromiter((self._row((bill_id, item_id)) for item_id in ids), dtype=np.int64, count=len(ids))
+        # Items whose answer key is not in the vocabulary (MISSING) have no confusion row to count in
+        keyed = answer_codes != MISSING
+        rows, user_codes, answer_codes = rows[keyed], user_codes[keyed], answer_codes[keyed]
+        missing = len(STEPS[step])
+        user_codes = np.where(user_codes < 0, missing, user_codes)
+        np.add.at(self._attempts[step], rows, 1)
+        np.add.at(self._confusion[step], (rows, answer_codes, user_codes), 1)
+
+    def _row(self, key):
+        row = self._index.get(key)
+        if row is None:
+            row = self._index[key] = len(self._ids)
+            self._ids.append(key)
+            if row >= len(self._attempts["categories"]):
+                self._grow(max(64, 2 * row))
+        return row
+
+    def _grow(self, capacity):
+        for step in STEPS:
+            attempts = np.zeros(capacity, dtype=np.int64)
+            attempts[:len(self._attempts[step])] = self._attempts[step]
+            self._attempts[step] = attempts
+            confusion = np.zeros((capacity,) + self._confusion[step].shape[1:], dtype=np.int64)
+            confusion[:len(self._confusion[step])] = self._confusion[step]
+            self._confusion[step] = confusion
+
+    # -- persistence ---------------------------------------------------------
+
+    def _snapshot(self):
+        n = len(self._ids)
+        tmp_path = self.snapshot_path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            # Bill ids may be ints or strings; JSON keeps them apart
+            bill_ids=np.array([json.dumps(bill_id) for bill_id, _ in self._ids], dtype=str),
+            ids=np.array([item_id for _, item_id in self._ids], dtype=str),
+            log_offset=np.int64(self._log_offset),
+            **{f"{step}_attempts": self._attempts[step][:n] for step in STEPS},
+            **{f"{step}_confusion": self._confusion[step][:n] for step in STEPS},
+        )
+        os.replace(tmp_path, self.snapshot_path)
+        self._unsnapshotted = 0
+
+    def flush(self):
+        """Write a snapshot if there are unsnapshotted records"""
+        with self._lock:
+            if self._unsnapshotted:
+                self._snapshot()
+
+    def _load(self):
+        if os.path.exists(self.snapshot_path):
+            with np.load(self.snapshot_path) as snapshot:
+                # Older snapshots were keyed by item id alone; those are rebuilt from the whole log
+                if "bill_ids" in snapshot:
+                    bill_ids = [json.loads(bill_id) for bill_id in snapshot["bill_ids"].tolist()]
+                    self._ids = list(zip(bill_ids, snapshot["ids"].tolist()))
+                    self._index = {key: row for row, key in enumerate(self._ids)}
+                    self._log_offset = int(snapshot["log_offset"])
+                    for step in STEPS:
+                        self._attempts[step] = snapshot[f"{step}_attempts"].copy()
+                        self._confusion[step] = snapshot[f"{step}_confusion"].copy()
+        if os.path.exists(self.log_path):
+            self._replay()
+
+    def _replay(self):
+        """Fold log records written after the last snapshot into the counters"""
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._log_offset += len(line)
+                record = json.loads(line)
+                self._apply(record["step"], record["bill_id"], record["ids"],
+                            np.array(record["user"], dtype=np.int64), np.array(record["answer"], dtype=np.int64))
+                self._unsnapshotted += 1
+
+    # -- queries -------------------------------------------------------------
+
+    def item_difficulty(self):
+        """Per-item attempts, accuracy and most common wrong answer, hardest first"""
+        with self._lock:
+            n = len(self._ids)
+            stats = {}
+            for step, vocab in STEPS.items():
+                attempts = self._attempts[step][:n]
+                confusion = self._confusion[step][:n]
+                correct = np.einsum("ijj->i", confusion[:, :, :len(vocab)])
+                wrong = confusion.sum(axis=1)
+                wrong[:, :len(vocab)] -= confusion[:, np.arange(len(vocab)), np.arange(len(vocab))]
+                stats[step] = (attempts, correct, wrong.argmax(axis=1), wrong.max(axis=1))
+            ids = list(self._ids)
+
+        rows = []
+        for row, (bill_id, item_id) in enumerate(ids):
+            entry = {"bill_id": bill_id, "id": item_id}
+            for step, vocab in STEPS.items():
+                attempts, correct, top_wrong, top_wrong_count = stats[step]
+                labels = vocab + ["(none)"]
+                entry[f"{step}_attempts"] = int(attempts[row])
+                entry[f"{step}_correct"] = int(correct[row])
+                entry[f"{step}_accuracy"] = round(float(correct[row] / attempts[row]), 4) if attempts[row] else None
+                entry[f"{step}_top_mistake"] = labels[top_wrong[row]] if top_wrong_count[row] else None
+            rows.append(entry)
+        rows.sort(key=lambda r: min(
+            a for a in (r["categories_accuracy"], r["optimizations_accuracy"], 1.0) if a is not None
+        ))
+        return rows
+
+    def confusion(self, bill_id, item_id, step):
+        """Confusion counts for one item of a bill: {correct answer: {player answer: count}}"""
+        vocab = STEPS[step]
+        with self._lock:
+            row = self._index.get((bill_id, item_id))
+            if row is None:
+                return {}
+            matrix = self._confusion[step][row].copy()
+        labels = vocab + ["(none)"]
+        return {
+            vocab[i]: {labels[j]: int(matrix[i, j]) for j in range(len(labels)) if matrix[i, j]}
+            for i in range(len(vocab)) if matrix[i].any()
+        }
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_tracker():
+    """Return the process-wide item statistics tracker"""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = ItemStats()
+                atexit.register(_tracker.flush)
+    return _tracker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CloudBill item-difficulty analytics")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    report = subparsers.add_parser("report", help="Show the hardest line items")
+    report.add_argument("--top", type=int, default=20, help="Number of items to show")
+    report.add_argument("--dir", default=DEFAULT_ANALYTICS_DIR, help="Analytics directory")
+    args = parser.parse_args()
+
+    stats = ItemStats(args.dir)
+    print(f"{'bill':<10}{'item':<16}{'cat tries':>10}{'cat acc':>9}  {'top cat mistake':<18}"
+          f"{'opt tries':>10}{'opt acc':>9}  {'top opt mistake':<18}")
+    for row in stats.item_difficulty()[:args.top]:
+        def fmt(accuracy):
+            return "-" if accuracy is None else f"{accuracy:.0%}"
+        print(f"{row['bill_id']!s:<10}{row['id']:<16}{row['categories_attempts']:>10}{fmt(row['categories_accuracy']):>9}  "
+              f"{row['categories_top_mistake'] or '-':<18}{row['optimizations_attempts']:>10}"
+              f"{fmt(row['optimizations_accuracy']):>9}  {row['optimizations_top_mistake'] or '-':<18}")
+    stats.flush()
+
+
+if __name__ == "__main__":
+    main()
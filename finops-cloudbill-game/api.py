@@ -0,0 +1,137 @@
+"""REST API for the CloudBill game (see code_doc.md).
+
+Serves random bills and grades categorizations/optimizations with the same
+logic as the Streamlit app, without importing Streamlit. Bills come from the
+process-wide bill store; each bill's public view (answers stripped) and its
+scoring columns are kept in a bounded LRU keyed on the store version, so a
+reload makes old entries unreachable. Handlers are plain functions: they do
+blocking file I/O and NumPy work, so FastAPI runs them in its threadpool.
+Responses for identical submissions are memoized in the shared validation
+cache (see ``results_cache.py``).
+
+Run with:
+    uvicorn api:app --host 0.0.0.0 --port 8000 --workers 4
+"""
+from typing import Dict
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from bill_store import get_store
+from results_cache import LRUCache, answers_fingerprint, validation_cache
+from scoring import BillColumns, decode_optimizations, score_optimizations, validate_categories
+
+PUBLIC_FIELDS = ("id", "resource", "description", "cost")
+BILL_CACHE_SIZE = 1024
+
+app = FastAPI(title="FinOps CloudBill Game API")
+
+
+class CategorySubmission(BaseModel):
+    categories: Dict[str, str]
+
+
+class OptimizationSubmission(BaseModel):
+    optimizations: Dict[str, str]
+
+
+class _CachedBill:
+    __slots__ = ("bill", "version", "public", "columns")
+
+    def __init__(self, bill, version):
+        self.bill = bill
+        self.version = version
+        self.public = {
+            "bill_id": bill["bill_id"],
+            "items": [{field: item[field] for field in PUBLIC_FIELDS} for item in bill["items"]],
+        }
+        self.columns = BillColumns.from_bill(bill)
+
+
+_bills = LRUCache(maxsize=BILL_CACHE_SIZE)
+
+
+def _cached(bill_id, bill=None):
+    """Return the cached view of a bill (None if it does not exist), building it on first use"""
+    store = get_store()
+    version = store.version
+
+    def build():
+        found = bill or store.get(bill_id)
+        return None if found is None else _CachedBill(found, version)
+
+    return _bills.get_or_compute((version, bill_id), build)
+
+
+def _lookup(bill_id):
+    """Resolve a bill id from the URL (numeric ids are stored as ints)"""
+    try:
+        entry = _cached(int(bill_id))
+    except ValueError:
+        entry = None
+    entry = entry or _cached(bill_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Bill {bill_id} not found")
+    return entry
+
+
+@app.get("/bills/random")
+def random_bill():
+    """Serve a random bill without its answer keys"""
+    bill = get_store().random_bill()
+    return _cached(bill["bill_id"], bill).public
+
+
+@app.get("/bills/{bill_id}")
+def get_bill(bill_id: str):
+    """Serve one bill without its answer keys"""
+    return _lookup(bill_id).public
+
+
+@app.post("/bills/{bill_id}/categories")
+def check_categories(bill_id: str, submission: CategorySubmission):
+    """Validate line item categorizations"""
+    entry = _lookup(bill_id)
+    key = ("api_categories", entry.public["bill_id"], entry.version, answers_fingerprint(submission.categories))
+    return validation_cache.get_or_compute(key, lambda: _category_response(entry, submission.categories))
+
+
+def _category_response(entry, categories):
+    results = validate_categories(entry.bill, categories)
+    correct = sum(1 for result in results.values() if result["is_correct"])
+    return {"correct": correct, "total": len(results), "results": results}
+
+
+@app.post("/bills/{bill_id}/optimizations")
+def check_optimizations(bill_id: str, submission: OptimizationSubmission):
+    """Validate optimization choices and return the before/after bill"""
+    entry = _lookup(bill_id)
+    key = ("api_optimizations", entry.public["bill_id"], entry.version, answers_fingerprint(submission.optimizations))
+    return validation_cache.get_or_compute(key, lambda: _optimization_response(entry, submission.optimizations))
+
+
+def _optimization_response(entry, optimizations):
+    columns = entry.columns
+    scores = score_optimizations(columns, columns.encode_optimizations(optimizations))
+    return {
+        "before_total": scores["before_total"],
+        "after_total": scores["after_total"],
+        "savings": scores["savings"],
+        "correct": int(scores["is_correct"].sum()),
+        "total": len(columns),
+        "details": [
+            {"id": item_id, "correct_opt": correct_opt, "after_cost": after_cost, "is_correct": is_correct}
+            for item_id, correct_opt, after_cost, is_correct in zip(
+                columns.ids,
+                decode_optimizations(columns.optimization_answer),
+                scores["after_cost"].tolist(),
+                scores["is_correct"].tolist()
+            )
+        ],
+    }
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss counters of the shared validation cache"""
+    return validation_cache.stats()
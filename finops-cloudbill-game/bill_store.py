@@ -0,0 +1,136 @@
+"""Process-wide bill store for the CloudBill game.
+
+Bills are parsed once per process and indexed by ``bill_id``. The store checks
+the file's mtime on access and only reloads when it changed, so editing
+``mock_bills.json`` still shows up without restarting Streamlit.
+
+Two formats are supported:
+
+- ``.json``: a list of bills (``mock_bills.json``), fully loaded in memory.
+  Callers get copies, so mutating a returned bill never touches the store.
+- ``.jsonl``: one bill per line. Only byte offsets are kept in memory, so a
+  random bill is one seek + one line read, whatever the corpus size.
+"""
+import copy
+import json
+import os
+import random
+import re
+import threading
+from array import array
+
+DEFAULT_BILLS_PATH = os.environ.get(
+    "CLOUDBILL_BILLS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_bills.json"),
+)
+
+# Fast path for JSONL lines written with ``bill_id`` as the first key
+_BILL_ID_PREFIX = re.compile(rb'^\s*\{\s*"bill_id"\s*:\s*(-?\d+|"(?:[^"\\]|\\.)*")\s*[,}]')
+
+
+class BillStore:
+    """In-memory bill index that reloads when the backing file changes"""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.is_jsonl = self.path.endswith(".jsonl")
+        self._lock = threading.Lock()
+        self._mtime = None
+        # (bills or JSONL offsets, bill_id -> bill or position), swapped in one assignment on reload
+        self._index = ([], {})
+
+    def _refresh(self):
+        """Reload the index if the file changed since the last load"""
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            if self.is_jsonl:
+                self._index_jsonl()
+            else:
+                self._load_json()
+            self._mtime = mtime
+
+    def _load_json(self):
+        with open(self.path, "r") as f:
+            bills = json.load(f)
+        self._index = (bills, {bill["bill_id"]: bill for bill in bills})
+
+    def _index_jsonl(self):
+        offsets = array("q")
+        by_id = {}
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    match = _BILL_ID_PREFIX.match(line)
+                    if match:
+                        bill_id = json.loads(match.group(1))
+                    else:
+                        bill_id = json.loads(line)["bill_id"]
+                    by_id[bill_id] = len(offsets)
+                    offsets.append(offset)
+                offset += len(line)
+        self._index = (offsets, by_id)
+
+    def _read_at(self, offset):
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    @property
+    def version(self):
+        """Modification time of the loaded file; changes whenever the store reloads"""
+        self._refresh()
+        return self._mtime
+
+    def __len__(self):
+        self._refresh()
+        return len(self._index[0])
+
+    def bill_ids(self):
+        """Return all known bill ids"""
+        self._refresh()
+        return list(self._index[1])
+
+    def get(self, bill_id):
+        """Return the bill with ``bill_id``, or None if it does not exist"""
+        self._refresh()
+        entries, by_id = self._index
+        if self.is_jsonl:
+            position = by_id.get(bill_id)
+            return None if position is None else self._read_at(entries[position])
+        bill = by_id.get(bill_id)
+        return None if bill is None else copy.deepcopy(bill)
+
+    def random_bill(self, rng=random):
+        """Return a random bill in O(1) without touching the other bills"""
+        self._refresh()
+        entries = self._index[0]
+        if self.is_jsonl:
+            return self._read_at(entries[rng.randrange(len(entries))])
+        return copy.deepcopy(rng.choice(entries))
+
+    def all_bills(self):
+        """Return every bill (loads the whole corpus in JSONL mode)"""
+        self._refresh()
+        entries = self._index[0]
+        if self.is_jsonl:
+            return [self._read_at(offset) for offset in entries]
+        return copy.deepcopy(entries)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path=None):
+    """Return the process-wide store for ``path`` (defaults to the mock bills)"""
+    path = os.path.abspath(path or DEFAULT_BILLS_PATH)
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(path, BillStore(path))
+    return store
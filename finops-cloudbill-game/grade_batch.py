@@ -0,0 +1,162 @@
+"""Headless batch grading for CloudBill submissions.
+
+Grades a JSONL file of offline submissions with the same logic as the game
+(``scoring.py``) across a process pool, without importing Streamlit.
+
+Each submission line looks like:
+    {"learner_id": "alice", "bill_id": 3,
+     "categories": {"ec2-3": "underprovisioned", ...},
+     "optimizations": {"ec2-3": "no action", ...}}
+
+Usage:
+    python grade_batch.py submissions.jsonl results.jsonl --workers 8
+"""
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+
+from bill_store import DEFAULT_BILLS_PATH, get_store
+from scoring import BillColumns, score_categories, score_optimizations
+
+CHUNK_SIZE = 2000
+COLUMNS_CACHE_SIZE = 256  # Bills whose columns each worker keeps
+
+# Per-worker state, set up by _init_worker
+_store = None
+_savings_rates = None
+
+
+def _init_worker(bills_path, savings_rates):
+    global _store, _savings_rates
+    _store = get_store(bills_path)
+    _savings_rates = savings_rates
+    _bill_columns.cache_clear()
+
+
+@lru_cache(maxsize=COLUMNS_CACHE_SIZE)
+def _bill_columns(bill_id):
+    bill = _store.get(bill_id)
+    return None if bill is None else BillColumns.from_bill(bill)
+
+
+def grade_submission(submission):
+    """Grade one submission and return its per-learner result"""
+    result = {"learner_id": submission.get("learner_id"), "bill_id": submission.get("bill_id")}
+    columns = _bill_columns(submission.get("bill_id"))
+    if columns is None:
+        result["error"] = "unknown bill_id"
+        return result
+
+    categories = score_categories(columns, columns.encode_categories(submission.get("categories") or {}))
+    optimizations = score_optimizations(
+        columns, columns.encode_optimizations(submission.get("optimizations") or {}), _savings_rates
+    )
+    result.update({
+        "items": len(columns),
+        "categories_correct": categories["correct"],
+        "optimizations_correct": int(optimizations["is_correct"].sum()),
+        "before_total": optimizations["before_total"],
+        "after_total": optimizations["after_total"],
+        "savings": optimizations["savings"],
+    })
+    return result
+
+
+def _grade_chunk(lines):
+    """Grade raw JSONL lines; return output lines and partial summary counters"""
+    out = []
+    graded = errors = perfect = 0
+    category_accuracy = optimization_accuracy = savings = 0.0
+    for line in lines:
+        try:
+            result = grade_submission(json.loads(line))
+        except (ValueError, TypeError, AttributeError) as e:
+            result = {"error": f"invalid submission: {e}"}
+        if "error" in result:
+            errors += 1
+        else:
+            graded += 1
+            items = result["items"] or 1
+            category_accuracy += result["categories_correct"] / items
+            optimization_accuracy += result["optimizations_correct"] / items
+            savings += result["savings"]
+            if result["categories_correct"] == result["optimizations_correct"] == result["items"]:
+                perfect += 1
+        out.append(json.dumps(result, separators=(",", ":")))
+    return out, (graded, errors, perfect, category_accuracy, optimization_accuracy, savings)
+
+
+def _chunks(f, size):
+    while True:
+        lines = [line for line in islice(f, size) if line.strip()]
+        if not lines:
+            return
+        yield lines
+
+
+def _write_chunk(out, chunk_result, totals):
+    lines, counts = chunk_result
+    out.write("\n".join(lines))
+    out.write("\n")
+    return [a + b for a, b in zip(totals, counts)]
+
+
+def grade_file(submissions_path, results_path, bills_path=None, workers=None, savings_rates=None,
+               chunk_size=CHUNK_SIZE):
+    """Grade every submission in ``submissions_path`` and return the summary"""
+    bills_path = bills_path or DEFAULT_BILLS_PATH
+    workers = workers or os.cpu_count() or 1
+    totals = [0, 0, 0, 0.0, 0.0, 0.0]
+    start = time.perf_counter()
+
+    with open(submissions_path, "r") as f, open(results_path, "w", buffering=1 << 20) as out, \
+            ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(bills_path, savings_rates)) as pool:
+        # Keep a bounded window of chunks in flight so memory stays flat on huge files
+        pending = deque()
+        for chunk in _chunks(f, chunk_size):
+            pending.append(pool.submit(_grade_chunk, chunk))
+            if len(pending) >= workers * 4:
+                totals = _write_chunk(out, pending.popleft().result(), totals)
+        while pending:
+            totals = _write_chunk(out, pending.popleft().result(), totals)
+
+    elapsed = time.perf_counter() - start
+    graded, errors, perfect, category_accuracy, optimization_accuracy, savings = totals
+    total = graded + errors
+    return {
+        "submissions": total,
+        "graded": graded,
+        "errors": errors,
+        "perfect": perfect,
+        "mean_category_accuracy": round(category_accuracy / graded, 4) if graded else 0.0,
+        "mean_optimization_accuracy": round(optimization_accuracy / graded, 4) if graded else 0.0,
+        "total_savings": round(savings, 2),
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "submissions_per_minute": round(total / elapsed * 60) if elapsed > 0 else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grade CloudBill submissions offline")
+    parser.add_argument("submissions", help="JSONL file with one submission per line")
+    parser.add_argument("results", help="JSONL file to write per-learner results to")
+    parser.add_argument("--bills", default=None, help="Bills file (.json or .jsonl); defaults to the game's bills")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--summary", default=None, help="Where to write the summary JSON (default: <results>.summary.json)")
+    args = parser.parse_args()
+
+    summary = grade_file(args.submissions, args.results, args.bills, args.workers)
+    summary_path = args.summary or f"{args.results}.summary.json"
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=2)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
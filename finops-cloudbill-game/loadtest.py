@@ -0,0 +1,86 @@
+"""Local load test for the CloudBill API.
+
+Simulates concurrent players running full game loops (random bill, submit
+categories, submit optimizations) and reports requests per second plus
+p50/p95/p99 latency per endpoint.
+
+Usage:
+    uvicorn api:app --port 8000 --workers 4 &
+    python loadtest.py --url http://localhost:8000 --players 64 --duration 20
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+
+import httpx
+import numpy as np
+
+from scoring import CATEGORIES, OPTIMIZATIONS
+
+
+async def _player(client, deadline, latencies, errors):
+    """Play full game loops until the deadline, recording per-request latency"""
+
+    async def call(name, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            errors[name] += 1
+            return None
+        latencies[name].append(time.perf_counter() - start)
+        return response.json()
+
+    while time.perf_counter() < deadline:
+        bill = await call("GET /bills/random", "GET", "/bills/random")
+        if bill is None:
+            continue
+        ids = [item["id"] for item in bill["items"]]
+        bill_url = f"/bills/{bill['bill_id']}"
+        await call("POST categories", "POST", f"{bill_url}/categories",
+                   json={"categories": {i: random.choice(CATEGORIES) for i in ids}})
+        await call("POST optimizations", "POST", f"{bill_url}/optimizations",
+                   json={"optimizations": {i: random.choice(OPTIMIZATIONS) for i in ids}})
+
+
+async def run(url, players, duration):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    limits = httpx.Limits(max_connections=players, max_keepalive_connections=players)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(_player(client, deadline, latencies, errors) for _ in range(players)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def report(latencies, errors, elapsed):
+    """Print throughput and latency percentiles"""
+    every = np.concatenate([np.asarray(v) for v in latencies.values()]) if latencies else np.empty(0)
+    total = len(every) + sum(errors.values())
+    print(f"{total:,} requests in {elapsed:.1f}s -> {total / elapsed:,.0f} req/s "
+          f"({sum(errors.values())} errors)")
+    print(f"{'endpoint':<22}{'count':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, values in [*sorted(latencies.items()), ("all", every)]:
+        if len(values) == 0:
+            continue
+        p50, p95, p99 = np.percentile(np.asarray(values) * 1000, [50, 95, 99])
+        print(f"{name:<22}{len(values):>9,}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the CloudBill API")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the API")
+    parser.add_argument("--players", type=int, default=32, help="Concurrent simulated players")
+    parser.add_argument("--duration", type=float, default=10.0, help="Test duration in seconds")
+    args = parser.parse_args()
+
+    report(*asyncio.run(run(args.url, args.players, args.duration)))
+
+
+if __name__ == "__main__":
+    main()
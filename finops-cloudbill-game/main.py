@@ -1,7 +1,12 @@
 import streamlit as st
-import random
-import json
+import pandas as pd
 import os
+import random
+
+from analytics import get_tracker
+from bill_store import get_store
+from results_cache import answers_fingerprint, validation_cache
+from scoring import CATEGORIES, OPTIMIZATIONS, decode_optimizations, validate_categories, validate_optimizations
 
 # Page configuration
 st.set_page_config(
@@ -51,8 +56,6 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Game constants
-CATEGORIES = ['idle', 'underprovisioned', 'overprovisioned']
-OPTIMIZATIONS = ['rightsizing', 'lifecycle policy', 'release', 'no action']
 TIPS = [
     "Rightsizing means matching resource size to actual usage.",
     "Lifecycle policies can automatically delete old backups.",
@@ -61,64 +64,101 @@ TIPS = [
     "Elastic IPs incur charges when not attached to running instances."
 ]
 
+# Bills with at least this many items are edited in one paged grid instead of one selectbox per item
+GRID_EDITOR_MIN_ITEMS = 20
+GRID_PAGE_SIZE = 250
+COST_COLUMN = st.column_config.NumberColumn("Cost ($)", format="$%.2f")
+SHOW_CACHE_STATS = os.environ.get("CLOUDBILL_SHOW_CACHE_STATS") == "1"
+
 def load_mock_bills():
-    """Load mock bills from JSON file"""
-    mock_bills_path = os.path.join(os.path.dirname(__file__), "mock_bills.json")
-    with open(mock_bills_path, "r") as f:
-        return json.load(f)
+    """Load mock bills from the shared bill store"""
+    return get_store().all_bills()
 
 def get_random_bill():
-    """Get a random bill from the mock data"""
-    bills = load_mock_bills()
-    return random.choice(bills)
+    """Get a random bill from the shared bill store (parsed once per process)"""
+    return get_store().random_bill()
 
-def validate_categories(bill, user_categories):
-    """Validate user category selections"""
-    results = {}
-    for item in bill["items"]:
-        correct = item["category_answer"]
-        user = user_categories.get(item["id"])
-        results[item["id"]] = {
-            "user": user, 
-            "correct": correct, 
-            "is_correct": user == correct
-        }
-    return results
+def bill_table(items, **extra_columns):
+    """Build the bill table with numeric costs (formatted on the client)"""
+    return pd.DataFrame({
+        "Resource": [item["resource"] for item in items],
+        "Description": [item["description"] for item in items],
+        "Cost ($)": [item["cost"] for item in items],
+        **extra_columns
+    })
 
-def validate_optimizations(bill, user_optimizations):
-    """Validate user optimization selections and calculate savings"""
-    before_total = sum(item["cost"] for item in bill["items"])
-    after_items = []
-    savings = 0
+def use_grid_editor(items):
+    """Large bills are edited in a single data editor to keep reruns small"""
+    return len(items) >= GRID_EDITOR_MIN_ITEMS
+
+def answer_grid(items, answers, label, options, key, **extra_columns):
+    """Edit one answer per item with a single paged data editor"""
+    pages = -(-len(items) // GRID_PAGE_SIZE)
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (1-{pages})", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+    start = (page - 1) * GRID_PAGE_SIZE
+    page_items = items[start:start + GRID_PAGE_SIZE]
+    ids = [item["id"] for item in page_items]
     
-    for item in bill["items"]:
-        correct_opt = item["optimization_answer"]
-        user_opt = user_optimizations.get(item["id"])
-        cost = item["cost"]
-        
-        if user_opt == correct_opt and correct_opt != "no action":
-            # Assume 80% savings for correct optimization
-            saved = round(cost * 0.8, 2)
-            after_cost = round(cost - saved, 2)
-            savings += saved
-        else:
-            after_cost = cost
-            
-        after_items.append({
-            **item, 
-            "after_cost": after_cost, 
-            "user_opt": user_opt, 
-            "correct_opt": correct_opt
-        })
+    # The page's bill columns are built once; the answer column is refreshed from ``answers`` on
+    # every render, since Streamlit drops the editor's edits while its page is not drawn
+    table_key = f"{key}_{page}"
+    table = st.session_state.grid_tables.get(table_key)
+    if table is None:
+        table = bill_table(page_items, **{name: values[start:start + GRID_PAGE_SIZE] for name, values in extra_columns.items()})
+        st.session_state.grid_tables[table_key] = table
+    current = [answers.get(item_id) or None for item_id in ids]
+    table = table.assign(**{label: current})
     
-    after_total = sum(i["after_cost"] for i in after_items)
+    edited = st.data_editor(
+        table,
+        key=table_key,
+        hide_index=True,
+        use_container_width=True,
+        disabled=[column for column in table.columns if column != label],
+        column_config={
+            "Cost ($)": COST_COLUMN,
+            label: st.column_config.SelectboxColumn(label, options=options)
+        }
+    )
+    # Only take the cells the player changed
+    answers.update(
+        (item_id, new or None) for item_id, old, new in zip(ids, current, edited[label].tolist())
+        if (new or None) != old
+    )
     
-    return {
-        "before_total": before_total,
-        "after_total": after_total,
-        "savings": round(savings, 2),
-        "details": after_items
-    }
+    answered = sum(1 for item in items if answers.get(item["id"]))
+    st.caption(f"{answered}/{len(items)} items answered")
+
+def all_answered(items, answers):
+    """Check that every item has an answer"""
+    return all(answers.get(item["id"]) for item in items)
+
+def answers_key(answers):
+    """Cache key for the current bill and an answer set"""
+    bill = st.session_state.current_bill
+    return (bill["bill_id"], get_store().version, answers_fingerprint(answers))
+
+def category_results_table(items, results):
+    """Build the category results table for large bills"""
+    return pd.DataFrame({
+        "Resource": [item["resource"] for item in items],
+        "Your answer": [result["user"] for result in results],
+        "Correct": [result["correct"] for result in results],
+        "Status": ["✅" if result["is_correct"] else "❌" for result in results]
+    })
+
+def final_results_table(items, results):
+    """Build the detailed optimization results table"""
+    return pd.DataFrame({
+        "Resource": [item["resource"] for item in items],
+        "Your Choice": decode_optimizations(results["user_codes"]),
+        "Correct Choice": decode_optimizations(results["correct_codes"]),
+        "Before": [item["cost"] for item in items],
+        "After": results["after_cost"],
+        "Status": ["✅" if is_correct else "❌" for is_correct in results["is_correct"].tolist()]
+    })
 
 def main():
     # Initialize session state
@@ -134,6 +174,8 @@ def main():
         st.session_state.category_results = {}
     if 'optimization_results' not in st.session_state:
         st.session_state.optimization_results = {}
+    if 'grid_tables' not in st.session_state:
+        st.session_state.grid_tables = {}
 
     # Main header
     st.markdown('<h1 class="main-header">💰 FinOps CloudBill Game</h1>', unsafe_allow_html=True)
@@ -148,75 +190,86 @@ def main():
             st.session_state.user_optimizations = {}
             st.session_state.category_results = {}
             st.session_state.optimization_results = {}
+            st.session_state.grid_tables = {}
             st.rerun()
+        if SHOW_CACHE_STATS:
+            st.caption("Validation cache")
+            st.json(validation_cache.stats())
+
+    items = st.session_state.current_bill["items"]
+    grid_mode = use_grid_editor(items)
 
     # Step 1: Categorization
     if st.session_state.game_step == 'categorize':
         st.markdown('<h2 class="step-header">Step 1: Categorize Each Line Item</h2>', unsafe_allow_html=True)
         
-        # Display bill items in a dataframe
-        bill_data = []
-        for item in st.session_state.current_bill["items"]:
-            bill_data.append({
-                "Resource": item["resource"],
-                "Description": item["description"],
-                "Cost ($)": f"${item['cost']:.2f}"
-            })
-        
-        st.dataframe(bill_data, use_container_width=True)
-        
-        # Category selection form
-        with st.form("category_form"):
+        if grid_mode:
+            # One editable grid for the whole bill
             st.subheader("Select the correct category for each item:")
+            answer_grid(items, st.session_state.user_categories, "Category", CATEGORIES, "cat_grid")
+            submitted = st.button("Submit Categories")
+        else:
+            # Display bill items in a dataframe
+            st.dataframe(bill_table(items), column_config={"Cost ($)": COST_COLUMN}, use_container_width=True)
             
-            # Create columns for better layout
-            cols = st.columns(2)
-            col_idx = 0
-            
-            for item in st.session_state.current_bill["items"]:
-                with cols[col_idx]:
-                    category = st.selectbox(
-                        f"{item['resource']} - ${item['cost']:.2f}",
-                        options=[""] + CATEGORIES,
-                        key=f"cat_{item['id']}",
-                        help=item['description']
-                    )
-                    st.session_state.user_categories[item['id']] = category
+            # Category selection form
+            with st.form("category_form"):
+                st.subheader("Select the correct category for each item:")
                 
-                col_idx = (col_idx + 1) % 2
-            
-            submitted = st.form_submit_button("Submit Categories")
-            
-            if submitted:
-                # Validate all categories are selected
-                if all(st.session_state.user_categories.values()):
-                    st.session_state.category_results = validate_categories(
-                        st.session_state.current_bill, 
-                        st.session_state.user_categories
-                    )
-                    st.session_state.game_step = 'category_results'
-                    st.rerun()
-                else:
-                    st.error("Please select a category for all items.")
+                # Create columns for better layout
+                cols = st.columns(2)
+                col_idx = 0
+                
+                for item in items:
+                    with cols[col_idx]:
+                        category = st.selectbox(
+                            f"{item['resource']} - ${item['cost']:.2f}",
+                            options=[""] + CATEGORIES,
+                            key=f"cat_{item['id']}",
+                            help=item['description']
+                        )
+                        st.session_state.user_categories[item['id']] = category
+                    
+                    col_idx = (col_idx + 1) % 2
+                
+                submitted = st.form_submit_button("Submit Categories")
+        
+        if submitted:
+            # Validate all categories are selected
+            if all_answered(items, st.session_state.user_categories):
+                st.session_state.category_key = answers_key(st.session_state.user_categories)
+                st.session_state.category_results = validation_cache.get_or_compute(
+                    ("categories", *st.session_state.category_key),
+                    lambda: validate_categories(st.session_state.current_bill, st.session_state.user_categories)
+                )
+                get_tracker().record_categories(st.session_state.current_bill, st.session_state.user_categories)
+                st.session_state.game_step = 'category_results'
+                st.rerun()
+            else:
+                st.error("Please select a category for all items.")
 
     # Show category results
     elif st.session_state.game_step == 'category_results':
         st.markdown('<h2 class="step-header">Category Results</h2>', unsafe_allow_html=True)
         
         # Display results
-        all_correct = True
-        for item in st.session_state.current_bill["items"]:
-            result = st.session_state.category_results[item["id"]]
-            status = "✅" if result["is_correct"] else "❌"
-            color_class = "feedback-correct" if result["is_correct"] else "feedback-incorrect"
-            
-            st.markdown(f"""
-            **{item['resource']}** - {status} 
-            <span class="{color_class}">Your answer: {result['user']} | Correct: {result['correct']}</span>
-            """, unsafe_allow_html=True)
-            
-            if not result["is_correct"]:
-                all_correct = False
+        results = [st.session_state.category_results[item["id"]] for item in items]
+        all_correct = all(result["is_correct"] for result in results)
+        if grid_mode:
+            table = validation_cache.get_or_compute(
+                ("category_table", *st.session_state.category_key),
+                lambda: category_results_table(items, results)
+            )
+            st.dataframe(table, hide_index=True, use_container_width=True)
+        else:
+            for item, result in zip(items, results):
+                status = "✅" if result["is_correct"] else "❌"
+                color_class = "feedback-correct" if result["is_correct"] else "feedback-incorrect"
+                
+                st.markdown(f"""
+                **{item['resource']}** - {status} 
+                <span class="{color_class}">Your answer: {result['user']} | Correct: {result['correct']}</span>
+                """, unsafe_allow_html=True)
         
         if all_correct:
             st.success("🎉 All categories correct! Moving to optimization step.")
@@ -232,51 +285,51 @@ def main():
     elif st.session_state.game_step == 'optimize':
         st.markdown('<h2 class="step-header">Step 2: Choose Best Optimization for Each Item</h2>', unsafe_allow_html=True)
         
-        # Display bill items again
-        bill_data = []
-        for item in st.session_state.current_bill["items"]:
-            bill_data.append({
-                "Resource": item["resource"],
-                "Description": item["description"],
-                "Cost ($)": f"${item['cost']:.2f}",
-                "Category": st.session_state.category_results[item["id"]]["correct"]
-            })
+        categories = [st.session_state.category_results[item["id"]]["correct"] for item in items]
         
-        st.dataframe(bill_data, use_container_width=True)
-        
-        # Optimization selection form
-        with st.form("optimization_form"):
+        if grid_mode:
             st.subheader("Select the best optimization for each item:")
+            answer_grid(items, st.session_state.user_optimizations, "Optimization", OPTIMIZATIONS, "opt_grid", Category=categories)
+            submitted = st.button("Submit Optimizations")
+        else:
+            # Display bill items again
+            st.dataframe(bill_table(items, Category=categories), column_config={"Cost ($)": COST_COLUMN}, use_container_width=True)
             
-            # Create columns for better layout
-            cols = st.columns(2)
-            col_idx = 0
-            
-            for item in st.session_state.current_bill["items"]:
-                with cols[col_idx]:
-                    optimization = st.selectbox(
-                        f"{item['resource']} - ${item['cost']:.2f}",
-                        options=[""] + OPTIMIZATIONS,
-                        key=f"opt_{item['id']}",
-                        help=item['description']
-                    )
-                    st.session_state.user_optimizations[item['id']] = optimization
+            # Optimization selection form
+            with st.form("optimization_form"):
+                st.subheader("Select the best optimization for each item:")
                 
-                col_idx = (col_idx + 1) % 2
-            
-            submitted = st.form_submit_button("Submit Optimizations")
-            
-            if submitted:
-                # Validate all optimizations are selected
-                if all(st.session_state.user_optimizations.values()):
-                    st.session_state.optimization_results = validate_optimizations(
-                        st.session_state.current_bill, 
-                        st.session_state.user_optimizations
-                    )
-                    st.session_state.game_step = 'final_results'
-                    st.rerun()
-                else:
-                    st.error("Please select an optimization for all items.")
+                # Create columns for better layout
+                cols = st.columns(2)
+                col_idx = 0
+                
+                for item in items:
+                    with cols[col_idx]:
+                        optimization = st.selectbox(
+                            f"{item['resource']} - ${item['cost']:.2f}",
+                            options=[""] + OPTIMIZATIONS,
+                            key=f"opt_{item['id']}",
+                            help=item['description']
+                        )
+                        st.session_state.user_optimizations[item['id']] = optimization
+                    
+                    col_idx = (col_idx + 1) % 2
+                
+                submitted = st.form_submit_button("Submit Optimizations")
+        
+        if submitted:
+            # Validate all optimizations are selected
+            if all_answered(items, st.session_state.user_optimizations):
+                st.session_state.optimization_key = answers_key(st.session_state.user_optimizations)
+                st.session_state.optimization_results = validation_cache.get_or_compute(
+                    ("optimizations", *st.session_state.optimization_key),
+                    lambda: validate_optimizations(st.session_state.current_bill, st.session_state.user_optimizations)
+                )
+                get_tracker().record_optimizations(st.session_state.current_bill, st.session_state.user_optimizations)
+                st.session_state.game_step = 'final_results'
+                st.rerun()
+            else:
+                st.error("Please select an optimization for all items.")
 
     # Final results
     elif st.session_state.game_step == 'final_results':
@@ -296,21 +349,19 @@ def main():
         
         # Detailed results table
         st.subheader("Detailed Results")
-        results_data = []
-        for item in results["details"]:
-            is_correct = item["user_opt"] == item["correct_opt"]
-            status = "✅" if is_correct else "❌"
-            
-            results_data.append({
-                "Resource": item["resource"],
-                "Your Choice": item["user_opt"],
-                "Correct Choice": item["correct_opt"],
-                "Before": f"${item['cost']:.2f}",
-                "After": f"${item['after_cost']:.2f}",
-                "Status": status
-            })
+        results_data = validation_cache.get_or_compute(
+            ("final_table", *st.session_state.optimization_key),
+            lambda: final_results_table(items, results)
+        )
         
-        st.dataframe(results_data, use_container_width=True)
+        st.dataframe(
+            results_data,
+            column_config={
+                "Before": st.column_config.NumberColumn(format="$%.2f"),
+                "After": st.column_config.NumberColumn(format="$%.2f")
+            },
+            use_container_width=True
+        )
         
         # Show tip
         tip = random.choice(TIPS)
@@ -329,6 +380,7 @@ def main():
             st.session_state.user_optimizations = {}
             st.session_state.category_results = {}
             st.session_state.optimization_results = {}
+            st.session_state.grid_tables = {}
             st.rerun()
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+"""Bounded LRU cache for CloudBill validation results.
+
+Results are keyed by (kind, bill_id, bill store version, answers fingerprint),
+so identical submissions for the same bill are graded once per process and
+shared across sessions. Cached values are shared objects and must not be
+mutated. Hit/miss counters are kept to help size the cache.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = int(os.environ.get("CLOUDBILL_RESULTS_CACHE_SIZE", "4096"))
+
+
+class LRUCache:
+    """Thread-safe LRU cache with hit/miss/eviction counters"""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, computing and storing it on a miss"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def answers_fingerprint(answers):
+    """Stable hash of an {item_id: answer} mapping"""
+    payload = json.dumps(answers, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+# Process-wide cache shared by every session
+validation_cache = LRUCache()
@@ -0,0 +1,140 @@
+"""Columnar scoring engine for CloudBill bills.
+
+A bill is turned into NumPy columns once (cost in int64 cents, answer codes)
+and user answers into code arrays, so before/after totals, per-item savings
+and correctness are computed in one vectorized pass instead of a per-item dict
+loop. Money stays in integer cents until the result is reported.
+
+The game's ``validate_*`` functions live here too, so grading can be reused
+without importing Streamlit.
+"""
+import numpy as np
+
+import money
+
+# Game constants
+CATEGORIES = ['idle', 'underprovisioned', 'overprovisioned']
+OPTIMIZATIONS = ['rightsizing', 'lifecycle policy', 'release', 'no action']
+
+# Share of an item's cost saved when the correct optimization is applied
+SAVINGS_RATES = {
+    "rightsizing": 0.8,
+    "lifecycle policy": 0.8,
+    "release": 0.8,
+    "no action": 0.0,
+}
+
+MISSING = -1
+
+_CATEGORY_CODES = {name: code for code, name in enumerate(CATEGORIES)}
+_OPTIMIZATION_CODES = {name: code for code, name in enumerate(OPTIMIZATIONS)}
+
+
+class BillColumns:
+    """Column view of a bill: item ids, costs in cents and answer codes"""
+
+    __slots__ = ("ids", "cost_cents", "category_answer", "optimization_answer")
+
+    def __init__(self, ids, cost_cents, category_answer, optimization_answer):
+        self.ids = ids
+        self.cost_cents = cost_cents
+        self.category_answer = category_answer
+        self.optimization_answer = optimization_answer
+
+    @classmethod
+    def from_bill(cls, bill):
+        items = bill["items"]
+        return cls(
+            ids=[item["id"] for item in items],
+            cost_cents=money.to_cents(np.fromiter((item["cost"] for item in items), dtype=np.float64, count=len(items))),
+            category_answer=_encode((item["category_answer"] for item in items), _CATEGORY_CODES, len(items)),
+            optimization_answer=_encode((item["optimization_answer"] for item in items), _OPTIMIZATION_CODES, len(items)),
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def encode_categories(self, user_categories):
+        """Encode a {item_id: category} mapping into a code array aligned with the bill"""
+        return _encode(map(user_categories.get, self.ids), _CATEGORY_CODES, len(self.ids))
+
+    def encode_optimizations(self, user_optimizations):
+        """Encode a {item_id: optimization} mapping into a code array aligned with the bill"""
+        return _encode(map(user_optimizations.get, self.ids), _OPTIMIZATION_CODES, len(self.ids))
+
+
+def _encode(values, codes, count):
+    return np.fromiter((codes.get(v, MISSING) for v in values), dtype=np.int8, count=count)
+
+
+def decode_optimizations(codes):
+    """Turn optimization codes back into names (None where MISSING)"""
+    # MISSING (-1) indexes the trailing None
+    return np.array(OPTIMIZATIONS + [None], dtype=object)[codes].tolist()
+
+
+def savings_rate_table(savings_rates=None):
+    """Return savings rates as an array indexed by optimization code"""
+    rates = {**SAVINGS_RATES, **(savings_rates or {})}
+    return np.array([rates[name] for name in OPTIMIZATIONS], dtype=np.float64)
+
+
+def score_categories(columns, user_codes):
+    """Return per-item correctness and the number of correct categories"""
+    # An item without an answer key is never correct, even when the user left it blank too
+    is_correct = (user_codes == columns.category_answer) & (columns.category_answer != MISSING)
+    return {"is_correct": is_correct, "correct": int(is_correct.sum())}
+
+
+def score_optimizations(columns, user_codes, savings_rates=None):
+    """Compute before/after totals, per-item savings and correctness in one pass"""
+    rates = savings_rate_table(savings_rates)
+    is_correct = (user_codes == columns.optimization_answer) & (columns.optimization_answer != MISSING)
+    rate = np.zeros(len(columns))
+    rate[is_correct] = rates[columns.optimization_answer[is_correct]]
+    saved_cents = money.scale(columns.cost_cents, rate)
+    before_cents = money.total(columns.cost_cents)
+    savings_cents = money.total(saved_cents)
+    return {
+        "before_total": money.to_dollars(before_cents),
+        "after_total": money.to_dollars(before_cents - savings_cents),
+        "savings": money.to_dollars(savings_cents),
+        "saved": money.to_dollars(saved_cents),
+        "after_cost": money.to_dollars(columns.cost_cents - saved_cents),
+        "is_correct": is_correct,
+    }
+
+
+def validate_categories(bill, user_categories):
+    """Validate user category selections"""
+    results = {}
+    for item in bill["items"]:
+        correct = item["category_answer"]
+        user = user_categories.get(item["id"])
+        results[item["id"]] = {
+            "user": user,
+            "correct": correct,
+            "is_correct": user == correct
+        }
+    return results
+
+
+def validate_optimizations(bill, user_optimizations, savings_rates=None):
+    """Validate user optimization selections and calculate savings.
+
+    Per-item results are returned as arrays aligned with ``bill["items"]``
+    (``after_cost``, ``user_codes``, ``correct_codes``, ``is_correct``); use
+    ``decode_optimizations`` to turn the codes into names for display.
+    """
+    columns = BillColumns.from_bill(bill)
+    user_codes = columns.encode_optimizations(user_optimizations)
+    scores = score_optimizations(columns, user_codes, savings_rates)
+    return {
+        "before_total": scores["before_total"],
+        "after_total": scores["after_total"],
+        "savings": scores["savings"],
+        "after_cost": scores["after_cost"],
+        "user_codes": user_codes,
+        "correct_codes": columns.optimization_answer,
+        "is_correct": scores["is_correct"],
+    }
@@ -0,0 +1,18 @@
+"""Checks for the CloudBill item-difficulty analytics"""
+from analytics import ItemStats
+
+
+def test_unknown_answer_key_is_not_counted(tmp_path):
+    bill = {"bill_id": 1, "items": [
+        {"id": "ec2-1", "resource": "EC2 Instance", "description": "", "cost": 10.0,
+         "category_answer": "idle", "optimization_answer": "rightsizing"},
+        {"id": "s3-2", "resource": "S3 Bucket", "description": "", "cost": 5.0,
+         "category_answer": "idle", "optimization_answer": "archive"},  # Not in OPTIMIZATIONS
+    ]}
+    stats = ItemStats(str(tmp_path))
+    stats.record_optimizations(bill, {"ec2-1": "rightsizing", "s3-2": "release"})
+
+    assert stats.confusion(1, "ec2-1", "optimizations") == {"rightsizing": {"rightsizing": 1}}
+    assert stats.confusion(1, "s3-2", "optimizations") == {}
+    # The same holds after a restart replays the log
+    assert ItemStats(str(tmp_path)).confusion(1, "s3-2", "optimizations") == {}
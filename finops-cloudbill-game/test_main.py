@@ -0,0 +1,28 @@
+"""AppTest checks for the CloudBill game's paged answer grid"""
+import os
+
+from streamlit.testing.v1 import AppTest
+
+from bill_generator import generate_bill
+from main import GRID_PAGE_SIZE
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def answered(at):
+    return sum(1 for answer in at.session_state.user_categories.values() if answer)
+
+
+def test_paging_keeps_answers():
+    bill = generate_bill(1, GRID_PAGE_SIZE + 50, seed=1)
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.session_state.current_bill = bill
+    at.run()
+
+    # Answers given on page 1 after its table was first drawn
+    at.session_state.user_categories = {item["id"]: item["category_answer"] for item in bill["items"][:GRID_PAGE_SIZE]}
+    at.number_input(key="cat_grid_page").set_value(2).run()
+    assert answered(at) == GRID_PAGE_SIZE
+    at.number_input(key="cat_grid_page").set_value(1).run()
+    assert not at.exception
+    assert answered(at) == GRID_PAGE_SIZE
@@ -1,72 +1,278 @@
 import streamlit as st
+import pandas as pd
+import math
+import os
 import random
-import time
 from datetime import datetime, timedelta
 
-# Constants
-PERSONAS = [
-    {"name": "Steady SaaS", "base_rate": 2.0, "spike_prob": 0.15, "spike_factor": 2.0},
-    {"name": "Spiky Batch", "base_rate": 1.0, "spike_prob": 0.35, "spike_factor": 4.0},
-    {"name": "Weekend Peak", "base_rate": 1.5, "spike_prob": 0.25, "spike_factor": 3.5},
-]
+import money
+from costs import coverage_gb, hourly_costs, summarize
+from downsample import CHART_POINTS
+from montecarlo import price_paths, risk_bands, simulate_usage
+from solver import COMMIT_STEP, MAX_COMMIT, commitment_candidates, cost_curve, gap_from_optimal
+from usage import HOURS_PER_DAY, PERSONAS, TERMS, new_seed, seeded_series
+from usage_import import list_exports, load_hourly_usage, parse_filters
+from usage_stats import HIST_BIN_GB, UsageStats, bin_width
 
-ON_DEMAND_RATE = 0.05  # $/GB-hour
-TOTAL_HOURS = 720  # 30 days * 24 hours
+# Constants
+TOTAL_HOURS = TERMS["30 days"]  # Default term: 30 days * 24 hours
+TICK_SECONDS = 1  # One simulated hour per second of wall time
+MIN_OBSERVATIONS = 5  # Data points to watch before the plan can be locked
+RISK_PATHS = 10_000  # Simulated 30-day futures behind the risk bands (fewer for longer terms)
+IMPORT_DIR = os.environ.get("COST_HERO_IMPORT_DIR")  # Server directory players may import exports from
 
-def generate_usage(persona, hour):
+def generate_usage(persona, hour, seed):
     """Generate RAM usage for a given hour based on persona characteristics"""
-    base = persona["base_rate"]
-    if random.random() < persona["spike_prob"]:
-        return base * persona["spike_factor"]
-    return base
+    return float(seeded_series(persona, seed, hour, 1)[0])
 
-def calculate_costs(usage_log, commit):
-    """Calculate all cost metrics"""
-    total_usage = sum(usage_log)
-    on_demand_cost = total_usage * ON_DEMAND_RATE
-    savings_plan_cost = commit * TOTAL_HOURS
-    overage_cost = max(0, total_usage - commit * TOTAL_HOURS) * ON_DEMAND_RATE
-    total_cost = savings_plan_cost + overage_cost
-    savings_pct = (on_demand_cost - total_cost) / on_demand_cost * 100 if on_demand_cost > 0 else 0
-    
-    return {
-        "on_demand_cost": on_demand_cost,
-        "savings_plan_cost": savings_plan_cost,
-        "overage_cost": overage_cost,
-        "total_cost": total_cost,
-        "savings_pct": savings_pct
-    }
+def calculate_costs(usage_log, commit, hours=None):
+    """Calculate all cost metrics hour by hour, projected to ``hours`` if given"""
+    return summarize(usage_log, commit, hours=hours)
+
+def costs_from_stats(stats, commit, hours=None):
+    """Cost metrics from the running usage histogram, without re-reading the log"""
+    values, counts = stats.histogram()
+    return summarize(values, commit, weights=counts, hours=hours)
+
+def generate_full_simulation(persona, hours=TOTAL_HOURS, seed=None):
+    """Generate the complete simulation (one value per hour of the term) in vectorized draws"""
+    return seeded_series(persona, new_seed() if seed is None else seed, 0, hours)
+
+def usage_series():
+    """Usage for the whole term, regenerated from the game's seed (or the imported series)"""
+    if st.session_state.imported:
+        return st.session_state.imported["series"]
+    return generate_full_simulation(st.session_state.persona, term_hours(), st.session_state.seed)
+
+@st.cache_resource(max_entries=6, show_spinner="Simulating possible futures...")
+def simulated_usage(persona_name, hours):
+    """Usage of RISK_PATHS simulated futures, shared read-only so the slider only re-prices them"""
+    persona = next(p for p in PERSONAS if p["name"] == persona_name)
+    paths = max(100, RISK_PATHS * TOTAL_HOURS // hours)
+    return simulate_usage(persona, paths, hours, seed=0)
+
+def risk_panel():
+    """P5/P50/P95 bill and savings for the current commitment over many simulated futures"""
+    hours = term_hours()
+    usage = simulated_usage(st.session_state.persona["name"], hours)
+    on_demand_cents, total_cents = price_paths(usage, st.session_state.commit)
+    bands = risk_bands(on_demand_cents, total_cents)
+    st.markdown(f"**🎲 Risk bands** across {len(total_cents):,} simulated {st.session_state.term} futures")
+    cost, savings = bands["total_cost"], bands["savings_pct"]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Median Bill", f"${cost[50]:,.2f}", delta=f"{savings[50]:.1f}% savings")
+    with col2:
+        st.metric("Bill Range (P5–P95)", f"${cost[5]:,.2f} – ${cost[95]:,.2f}")
+    with col3:
+        st.metric("Savings Range (P5–P95)", f"{savings[5]:.1f}% – {savings[95]:.1f}%")
+
+def term_hours():
+    """Hours in the selected Savings Plan term (or in the imported usage)"""
+    if st.session_state.imported:
+        return len(st.session_state.imported["series"])
+    return TERMS[st.session_state.term]
 
-def generate_full_simulation(persona):
-    """Generate complete 30-day simulation data"""
-    full_usage = []
-    for hour in range(TOTAL_HOURS):
-        usage = generate_usage(persona, hour)
-        full_usage.append(usage)
-    return full_usage
+def commitment_range():
+    """Slider maximum and step; imported usage may need more than the personas"""
+    if not st.session_state.imported:
+        return MAX_COMMIT, COMMIT_STEP
+    peak_commit = float(st.session_state.imported["series"].max()) / float(coverage_gb(1.0))
+    step = max(COMMIT_STEP, math.ceil(peak_commit) / 100)
+    return max(MAX_COMMIT, math.ceil(peak_commit / step) * step), step
+
+def hist_bin_gb():
+    """Histogram bin width for the live statistics, sized to the imported series' peak"""
+    imported = st.session_state.get("imported")
+    return bin_width(imported["series"].max()) if imported else HIST_BIN_GB
+
+def import_sidebar():
+    """Sidebar for playing on hourly usage imported from a CSV/Parquet export in ``IMPORT_DIR``"""
+    if not IMPORT_DIR:
+        return
+    with st.sidebar:
+        st.header("📂 Use Your Own Usage")
+        st.caption("Aggregate a CSV or Parquet usage export (e.g. AWS CUR) on the server to hourly usage")
+        try:
+            exports = list_exports(IMPORT_DIR)
+        except OSError as e:
+            st.error(f"Cannot list {IMPORT_DIR}: {e}")
+            return
+        # Only files listed from IMPORT_DIR can be picked, never an arbitrary server path
+        name = st.selectbox("Export file", exports, index=None, placeholder="Choose an export")
+        path = os.path.join(IMPORT_DIR, name) if name else None
+        group_col = st.text_input("Split by column (optional)", placeholder="lineItem/UsageAccountId")
+        filter_text = st.text_input("Filter (optional)", placeholder="lineItem/UsageType=GB-Hours",
+                                    help="Keep rows whose COLUMN contains TEXT")
+        with st.expander("Column names"):
+            time_col = st.text_input("Timestamp column", placeholder="auto-detect")
+            value_col = st.text_input("Usage amount column", placeholder="auto-detect")
+        if st.button("Import", disabled=not path):
+            try:
+                with st.spinner("Importing usage..."):
+                    st.session_state.hourly_usage = load_hourly_usage(
+                        path, time_col or None, value_col or None, group_col or None,
+                        parse_filters([filter_text] if filter_text else [])
+                    )
+            except (OSError, ValueError, ImportError) as e:
+                st.error(f"Import failed: {e}")
+        
+        hourly = st.session_state.get("hourly_usage")
+        if hourly is not None:
+            group = st.selectbox("Usage series", hourly.groups)
+            st.caption(f"{hourly.hours:,} hours from {hourly.start:%Y-%m-%d %H:%M} UTC")
+            if hourly.dropped_rows:
+                st.warning(f"Skipped {hourly.dropped_rows:,} rows with a blank or unparseable timestamp or usage")
+            if st.button("▶️ Play with this series"):
+                st.session_state.imported = {"name": group, "series": hourly.series(group), "start": hourly.start}
+                reset_game()
+                st.rerun()
+        if st.session_state.imported and st.button("🎲 Back to simulated startups"):
+            st.session_state.imported = None
+            reset_game()
+            st.rerun()
 
 def initialize_game():
     """Initialize or reset the game state"""
     if "persona" not in st.session_state:
         st.session_state.persona = random.choice(PERSONAS)
-    if "usage_log" not in st.session_state:
-        st.session_state.usage_log = []
+    if "seed" not in st.session_state:
+        st.session_state.seed = new_seed()
+    if "stats" not in st.session_state:
+        st.session_state.stats = UsageStats(bin_gb=hist_bin_gb())
     if "commit" not in st.session_state:
-        st.session_state.commit = 1.0
+        st.session_state.commit = 0.05
     if "locked" not in st.session_state:
         st.session_state.locked = False
     if "tick" not in st.session_state:
         st.session_state.tick = 0
     if "game_complete" not in st.session_state:
         st.session_state.game_complete = False
+    if "term" not in st.session_state:
+        st.session_state.term = "30 days"
+    if "imported" not in st.session_state:
+        st.session_state.imported = None
 
 def reset_game():
     """Reset the game state for a new game"""
-    for key in ["persona", "usage_log", "commit", "locked", "tick", "game_complete"]:
+    for key in ["persona", "seed", "stats", "commit", "locked", "tick", "game_complete"]:
         if key in st.session_state:
             del st.session_state[key]
     initialize_game()
 
+def advance_simulation():
+    """Simulate the next hour and fold it into the running statistics"""
+    if st.session_state.tick < term_hours():
+        if st.session_state.imported:
+            usage = float(st.session_state.imported["series"][st.session_state.tick])
+        else:
+            usage = generate_usage(st.session_state.persona, st.session_state.tick, st.session_state.seed)
+        st.session_state.stats.add(usage)
+        st.session_state.tick += 1
+
+def finish_simulation():
+    """Fast-forward to the end of the term and end the game"""
+    st.session_state.stats = UsageStats.from_series(usage_series())
+    st.session_state.tick = term_hours()
+    st.session_state.game_complete = True
+
+def live_usage_panel():
+    """Live chart and usage stats; advances the simulation by one hour per run"""
+    if not st.session_state.game_complete:
+        advance_simulation()
+        # The lock button and the results live outside this panel, so rerun the
+        # whole app when they change
+        if st.session_state.tick >= term_hours():
+            st.session_state.game_complete = True
+            st.rerun()
+        if st.session_state.stats.count == MIN_OBSERVATIONS:
+            st.rerun()
+    
+    stats = st.session_state.stats
+    
+    # Guidance for decision making
+    if stats.count < 5:
+        st.warning(f"⏳ **Please observe {5 - stats.count} more data points** before making your decision!")
+        st.info("📊 **Why 5 data points?** This helps you understand the usage pattern, including any spikes or variations.")
+        
+        # Progress bar for data collection
+        progress = stats.count / 5
+        st.progress(progress, text=f"Data points collected: {stats.count}/5")
+    elif stats.count == 5:
+        st.success("✅ **Perfect!** You've observed 5 data points. Now analyze the pattern and set your commitment!")
+    else:
+        st.success("✅ **Ready to decide!** You've observed the RAM usage pattern. Set your commitment and lock in your plan!")
+    
+    if stats.count:
+        # Whole history, downsampled to a fixed number of points (spikes kept)
+        hours, chart_data = stats.overview()
+        
+        # Create a DataFrame for better chart display
+        df = pd.DataFrame({
+            'RAM Usage (GB)': chart_data,
+            'Hour': hours
+        })
+        
+        # Enhanced chart with better styling
+        st.line_chart(df.set_index('Hour'))
+        
+        # Show current usage stats
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            current_usage = stats.last
+            st.metric("Current Usage", f"{current_usage:.2f} GB RAM")
+        with col2:
+            st.metric("Average Usage", f"{stats.mean:.2f} GB RAM", help=f"Standard deviation: {stats.std:.2f} GB")
+        with col3:
+            st.metric("Peak Usage", f"{stats.max:.2f} GB RAM")
+        
+        # Show spike detection
+        if stats.count >= 2:
+            recent_usage = stats.window(3)  # Last 3 points
+            avg_recent = float(recent_usage.mean())
+            if current_usage > avg_recent * 1.5:
+                st.warning("🚨 **SPIKE DETECTED!** Current usage is significantly higher than recent average.")
+            elif current_usage < avg_recent * 0.7:
+                st.info("📉 **LOW USAGE** - Current usage is below recent average.")
+    else:
+        st.write("Usage data will appear here as the simulation runs...")
+
+def projection_panel():
+    """Cost projection for the current commitment and the month progress bar"""
+    stats = st.session_state.stats
+    if not st.session_state.locked and stats.count:
+        costs = costs_from_stats(stats, st.session_state.commit, term_hours())
+        st.metric(
+            "Current Projection", 
+            f"${costs['total_cost']:,.2f}",
+            delta=f"{costs['savings_pct']:.1f}% savings"
+        )
+        
+        # Commitment guidance
+        avg_usage = stats.mean
+        covered = float(coverage_gb(st.session_state.commit))
+        if covered < avg_usage * 0.8:
+            st.warning("⚠️ **Low commitment:** You might face expensive overage charges during RAM spikes!")
+        elif covered > avg_usage * 1.5:
+            st.info("ℹ️ **High commitment:** You're paying for more RAM than you typically use.")
+        else:
+            st.success("✅ **Good balance:** Your commitment aligns well with current RAM usage patterns!")
+        
+        # Cost of every slider position for the usage observed so far
+        values, counts = stats.histogram()
+        curve = cost_curve(values, candidates=commitment_candidates(*commitment_range()), weights=counts)
+        st.line_chart(pd.DataFrame({
+            'Commitment ($/hour)': curve['candidates'],
+            'Total Cost ($)': money.to_dollars(curve['total_cents'])
+        }).set_index('Commitment ($/hour)'))
+        st.caption(f"Best commitment for the usage so far: ${curve['best_commit']:.2f}/hour")
+    
+    # Progress Bar
+    hours = term_hours()
+    progress = min(st.session_state.tick / hours, 1.0)
+    day = min(st.session_state.tick // HOURS_PER_DAY + 1, hours // HOURS_PER_DAY)
+    st.progress(progress, text=f"Day {day}/{hours // HOURS_PER_DAY} - Hour {st.session_state.tick % HOURS_PER_DAY + 1}/24")
+
 def main():
     st.set_page_config(
         page_title="Cloud Cost Hero",
@@ -79,7 +285,11 @@ def main():
     
     # Title
     st.title("🎮 Cloud Cost Hero")
-    st.markdown("**Minimize your 30-day AWS bill by choosing the right Compute Savings Plan!**")
+    import_sidebar()
+    if st.session_state.imported:
+        st.markdown(f"**Minimize your AWS bill over {term_hours() // HOURS_PER_DAY} days of your own usage by choosing the right Compute Savings Plan!**")
+    else:
+        st.markdown(f"**Minimize your AWS bill over a {st.session_state.term} term by choosing the right Compute Savings Plan!**")
     
     # Game Instructions
     with st.expander("📖 How to Play", expanded=True):
@@ -97,6 +307,7 @@ def main():
         **💡 Pro Tips:**
         - **Higher commitment** = lower per-hour cost but you pay even when not using
         - **Lower commitment** = pay only for what you use, but higher per-hour cost
+        - **Commitments apply hour by hour** - unused commitment in a quiet hour can't pay for a spike later
         - **Watch for usage spikes** to avoid expensive overage charges
         - **Aim for 30%+ savings** to get the balloons celebration! 🎈
         """)
@@ -104,73 +315,40 @@ def main():
     # Persona Card
     with st.container():
         col1, col2 = st.columns([1, 2])
-        with col1:
-            st.info(f"**Startup:** {st.session_state.persona['name']}")
-        with col2:
-            st.write(f"Base usage: {st.session_state.persona['base_rate']:.1f} GB RAM/hour")
-            st.write(f"Spike probability: {st.session_state.persona['spike_prob']*100:.0f}% (higher = more spikes)")
-            st.write(f"Spike factor: {st.session_state.persona['spike_factor']}x (higher = bigger spikes)")
+        if st.session_state.imported:
+            with col1:
+                st.info(f"**Your usage:** {st.session_state.imported['name']}")
+            with col2:
+                st.write(f"{term_hours():,} hours of imported usage starting {st.session_state.imported['start']:%Y-%m-%d %H:%M} UTC")
+                st.caption("💡 The game replays your real usage hour by hour")
+        else:
+            with col1:
+                st.info(f"**Startup:** {st.session_state.persona['name']}")
+            with col2:
+                st.write(f"Base usage: {st.session_state.persona['base_rate']:.1f} GB RAM/hour")
+                if st.session_state.persona.get('weekend_spike_prob') is not None:
+                    st.write(f"Spike probability: {st.session_state.persona['spike_prob']*100:.0f}% weekdays, {st.session_state.persona['weekend_spike_prob']*100:.0f}% weekends (higher = more spikes)")
+                else:
+                    st.write(f"Spike probability: {st.session_state.persona['spike_prob']*100:.0f}% (higher = more spikes)")
+                st.write(f"Spike factor: {st.session_state.persona['spike_factor']}x (higher = bigger spikes)")
             
-            # Add persona-specific guidance
-            if st.session_state.persona['name'] == "Steady SaaS":
-                st.caption("💡 Moderate spikes, good for learning")
-            elif st.session_state.persona['name'] == "Spiky Batch":
-                st.caption("💡 Frequent large spikes - watch out!")
-            elif st.session_state.persona['name'] == "Weekend Peak":
-                st.caption("💡 Occasional big spikes - plan carefully")
+                # Add persona-specific guidance
+                if st.session_state.persona['name'] == "Steady SaaS":
+                    st.caption("💡 Moderate spikes, busy afternoons and slow growth - good for learning")
+                elif st.session_state.persona['name'] == "Spiky Batch":
+                    st.caption("💡 Frequent large spikes around the nightly batch window - watch out!")
+                elif st.session_state.persona['name'] == "Weekend Peak":
+                    st.caption("💡 Busier weekends with big spikes - plan carefully")
     
     # Live Usage Chart
     st.subheader("📊 Live RAM Usage Simulation")
     
-    # Guidance for decision making
-    if len(st.session_state.usage_log) < 5:
-        st.warning(f"⏳ **Please observe {5 - len(st.session_state.usage_log)} more data points** before making your decision!")
-        st.info("📊 **Why 5 data points?** This helps you understand the usage pattern, including any spikes or variations.")
-        
-        # Progress bar for data collection
-        progress = len(st.session_state.usage_log) / 5
-        st.progress(progress, text=f"Data points collected: {len(st.session_state.usage_log)}/5")
-    elif len(st.session_state.usage_log) == 5:
-        st.success("✅ **Perfect!** You've observed 5 data points. Now analyze the pattern and set your commitment!")
+    # While the simulation runs, the live panels refresh themselves as fragments:
+    # only they rerun on each tick, not the whole script.
+    if st.session_state.game_complete:
+        live_usage_panel()
     else:
-        st.success("✅ **Ready to decide!** You've observed the RAM usage pattern. Set your commitment and lock in your plan!")
-    
-    if st.session_state.usage_log:
-        # Show last 50 points for responsiveness
-        chart_data = st.session_state.usage_log[-50:]
-        
-        # Create a DataFrame for better chart display
-        import pandas as pd
-        df = pd.DataFrame({
-            'RAM Usage (GB)': chart_data,
-            'Hour': range(len(chart_data))
-        })
-        
-        # Enhanced chart with better styling
-        st.line_chart(df.set_index('Hour'))
-        
-        # Show current usage stats
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            current_usage = st.session_state.usage_log[-1]
-            st.metric("Current Usage", f"{current_usage:.2f} GB RAM")
-        with col2:
-            avg_usage = sum(st.session_state.usage_log)/len(st.session_state.usage_log)
-            st.metric("Average Usage", f"{avg_usage:.2f} GB RAM")
-        with col3:
-            peak_usage = max(st.session_state.usage_log)
-            st.metric("Peak Usage", f"{peak_usage:.2f} GB RAM")
-        
-        # Show spike detection
-        if len(st.session_state.usage_log) >= 2:
-            recent_usage = st.session_state.usage_log[-3:]  # Last 3 points
-            avg_recent = sum(recent_usage) / len(recent_usage)
-            if current_usage > avg_recent * 1.5:
-                st.warning("🚨 **SPIKE DETECTED!** Current usage is significantly higher than recent average.")
-            elif current_usage < avg_recent * 0.7:
-                st.info("📉 **LOW USAGE** - Current usage is below recent average.")
-    else:
-        st.write("Usage data will appear here as the simulation runs...")
+        st.fragment(run_every=TICK_SECONDS)(live_usage_panel)()
     
     # Game Controls
     st.subheader("🎯 Set Your Savings Plan")
@@ -179,82 +357,58 @@ def main():
         # Pre-lock controls
         col1, col2 = st.columns([2, 1])
         with col1:
+            max_commit, commit_step = commitment_range()
             st.session_state.commit = st.slider(
                 "Hourly commitment ($)", 
                 min_value=0.0, 
-                max_value=5.0, 
-                value=st.session_state.commit, 
-                step=0.1,
+                max_value=max_commit, 
+                value=min(st.session_state.commit, max_commit), 
+                step=commit_step,
                 help="Set your hourly commitment for the Compute Savings Plan (how much you'll pay per hour for RAM)"
             )
+            if not st.session_state.imported:
+                st.session_state.term = st.selectbox(
+                    "Savings Plan term",
+                    options=list(TERMS),
+                    index=list(TERMS).index(st.session_state.term),
+                    help="Length of the commitment; the final bill is simulated over the whole term"
+                )
         with col2:
             # Disable lock button until 5 data points are observed
-            can_lock = len(st.session_state.usage_log) >= 5
+            can_lock = st.session_state.stats.count >= MIN_OBSERVATIONS
             if st.button("🔒 Lock-in Plan", type="primary", disabled=not can_lock):
                 st.session_state.locked = True
+                # Jump to results immediately after lock
+                finish_simulation()
                 st.rerun()
             
             if not can_lock:
                 st.caption("⏳ Wait for 5 data points")
         
-        # Show current projection
-        if st.session_state.usage_log:
-            costs = calculate_costs(st.session_state.usage_log, st.session_state.commit)
-            st.metric(
-                "Current Projection", 
-                f"${costs['total_cost']:,.2f}",
-                delta=f"{costs['savings_pct']:.1f}% savings"
-            )
-            
-            # Commitment guidance
-            avg_usage = sum(st.session_state.usage_log) / len(st.session_state.usage_log)
-            if st.session_state.commit < avg_usage * 0.8:
-                st.warning("⚠️ **Low commitment:** You might face expensive overage charges during RAM spikes!")
-            elif st.session_state.commit > avg_usage * 1.5:
-                st.info("ℹ️ **High commitment:** You're paying for more RAM than you typically use.")
-            else:
-                st.success("✅ **Good balance:** Your commitment aligns well with current RAM usage patterns!")
+        if st.session_state.imported:
+            st.caption("🎲 Risk bands need a usage model, so they're only shown for the simulated startups")
+        else:
+            risk_panel()
     else:
         # Post-lock display
         st.success("✅ Plan locked! Jumping to results...")
         st.metric(
             "Locked Commitment", 
-            f"${st.session_state.commit:.1f}/hour"
+            f"${st.session_state.commit:.2f}/hour"
         )
     
-    # Progress Bar
-    progress = st.session_state.tick / TOTAL_HOURS
-    st.progress(progress, text=f"Day {st.session_state.tick // 24 + 1}/30 - Hour {st.session_state.tick % 24 + 1}/24")
-    
-    # Simulation Logic
-    if not st.session_state.game_complete:
-        if st.session_state.tick < TOTAL_HOURS:
-            # Generate usage for current hour
-            usage = generate_usage(st.session_state.persona, st.session_state.tick)
-            st.session_state.usage_log.append(usage)
-            st.session_state.tick += 1
-            
-            # Control simulation speed
-            if st.session_state.locked:
-                # Jump to results immediately after lock
-                st.session_state.usage_log = generate_full_simulation(st.session_state.persona)
-                st.session_state.tick = TOTAL_HOURS
-                st.session_state.game_complete = True
-                st.rerun()
-            else:
-                time.sleep(1)  # Faster simulation to show spikes quickly
-            
-            st.rerun()
-        else:
-            # Game complete
-            st.session_state.game_complete = True
-            st.rerun()
+    if st.session_state.game_complete:
+        projection_panel()
+    else:
+        st.fragment(run_every=TICK_SECONDS)(projection_panel)()
     
     # Results Display
     if st.session_state.game_complete:
         st.subheader("🏆 Final Results")
         
-        costs = calculate_costs(st.session_state.usage_log, st.session_state.commit)
+        stats = st.session_state.stats
+        usage = usage_series()
+        costs = calculate_costs(usage, st.session_state.commit)
         
         # Results metrics
         col1, col2, col3 = st.columns(3)
@@ -275,13 +429,46 @@ def main():
                 f"${costs['on_demand_cost'] - costs['total_cost']:,.2f}"
             )
         
+        # Comparison with the best commitment in hindsight
+        curve = cost_curve(usage, candidates=commitment_candidates(*commitment_range()))
+        gap = gap_from_optimal(money.to_cents(costs['total_cost']), curve['best_cents'])
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Optimal Commitment", f"${curve['best_commit']:.2f}/hour")
+        with col2:
+            st.metric("Optimal Total Cost", money.format_cents(curve["best_cents"]))
+        if gap > 0:
+            st.caption(f"You were {gap:.1f}% from optimal.")
+        else:
+            st.caption("🎯 You picked the optimal commitment!")
+        
         # Cost breakdown
         st.subheader("💰 Cost Breakdown")
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         with col1:
             st.metric("Savings Plan Cost", f"${costs['savings_plan_cost']:,.2f}")
         with col2:
             st.metric("Overage Cost", f"${costs['overage_cost']:,.2f}")
+        with col3:
+            st.metric(
+                "Unused Commitment",
+                f"${costs['waste_cost']:,.2f}",
+                delta=f"{costs['utilization_pct']:.1f}% utilized",
+                delta_color="off"
+            )
+        
+        # Hour-by-hour breakdown, summed per period (one day, or more on long terms to cap the chart size)
+        breakdown = hourly_costs(usage, st.session_state.commit)
+        period_days = max(1, -(-(len(usage) // HOURS_PER_DAY) // CHART_POINTS))
+        period_hours = period_days * HOURS_PER_DAY
+        periods = len(usage) // period_hours
+        summed = {
+            label: breakdown[key][:periods * period_hours].reshape(periods, period_hours).sum(axis=1)
+            for label, key in [("Covered", "covered_gb"), ("Overage", "overage_gb"), ("Unused", "waste_gb")]
+        }
+        st.caption(f"RAM GB-hours per {'day' if period_days == 1 else f'{period_days} days'}: "
+                   "covered by the plan, billed On-Demand, and committed but unused")
+        st.area_chart(pd.DataFrame(summed, index=pd.RangeIndex(1, periods * period_days + 1, period_days, name="Day")))
         
         # Feedback
         if costs['savings_pct'] >= 30:
@@ -296,10 +483,10 @@ def main():
         
         # Usage statistics
         st.subheader("📈 RAM Usage Statistics")
-        total_usage = sum(st.session_state.usage_log)
-        avg_usage = total_usage / len(st.session_state.usage_log)
-        max_usage = max(st.session_state.usage_log)
-        min_usage = min(st.session_state.usage_log)
+        total_usage = stats.total
+        avg_usage = stats.mean
+        max_usage = stats.max
+        min_usage = stats.min
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
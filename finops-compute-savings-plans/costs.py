@@ -0,0 +1,75 @@
+"""Hour-granular Savings Plan cost engine.
+
+A commitment of ``commit`` $/hour buys ``commit / (rate * (1 - discount))``
+GB of RAM at the discounted Savings Plan rate for every single hour. Within
+an hour, usage up to that capacity is covered. Usage above it is billed On-Demand,
+and unused capacity is wasted: it cannot offset a spike in another hour.
+Everything is computed with ``np.minimum``/``np.maximum`` over the last
+axis, so ``usage`` can be one series or a ``(series, hours)`` batch.
+Per-hour amounts are float dollars for charts. Totals are rounded to cents once.
+"""
+import numpy as np
+
+import money
+
+ON_DEMAND_RATE = 0.05  # $/GB-hour
+DISCOUNT_RATE = 0.50  # Savings Plan discount off the On-Demand rate (AWS offers up to 66%)
+
+
+def coverage_gb(commit, rate=ON_DEMAND_RATE, discount=DISCOUNT_RATE):
+    """GB of RAM per hour that a ``commit`` $/hour commitment pays for"""
+    return np.asarray(commit, dtype=np.float64) / (rate * (1 - discount))
+
+
+def hourly_costs(usage, commit, rate=ON_DEMAND_RATE, discount=DISCOUNT_RATE):
+    """Per-hour breakdown of usage and cost under a commitment"""
+    usage = np.asarray(usage, dtype=np.float64)
+    capacity = coverage_gb(commit, rate, discount)
+    covered = np.minimum(usage, capacity)
+    overage = np.maximum(usage - capacity, 0.0)
+    waste = np.maximum(capacity - usage, 0.0)
+    return {
+        "covered_gb": covered,
+        "overage_gb": overage,
+        "waste_gb": waste,
+        "on_demand_cost": usage * rate,
+        "commit_cost": np.broadcast_to(np.asarray(commit, dtype=np.float64), usage.shape),
+        "overage_cost": overage * rate,
+        "waste_cost": waste * rate * (1 - discount),
+    }
+
+
+def summarize(usage, commit, rate=ON_DEMAND_RATE, discount=DISCOUNT_RATE, weights=None, hours=None):
+    """Total cost metrics of a commitment over the last axis of ``usage``.
+
+    ``weights`` counts how many hours each usage value stands for (e.g. a
+    histogram). With ``hours`` longer than the priced hours, totals are
+    projected pro rata. One series gives scalars; a batch gives arrays.
+    """
+    usage = np.asarray(usage, dtype=np.float64)
+    weights = np.ones(usage.shape[-1]) if weights is None else np.asarray(weights, dtype=np.float64)
+    capacity = coverage_gb(commit, rate, discount)
+    observed = float(np.sum(weights))
+    factor = hours / observed if hours and observed else 1.0
+
+    # Only the overage needs a pass over the hours; everything else follows from the sums
+    usage_gb = usage @ weights
+    overage_gb = np.maximum(usage - np.expand_dims(capacity, -1), 0.0) @ weights
+    covered_gb = usage_gb - overage_gb
+    capacity_gb = capacity * observed
+    waste_gb = capacity_gb - covered_gb
+
+    on_demand_cents = money.to_cents(usage_gb * rate * factor)
+    savings_plan_cents = money.to_cents(commit) * round(observed * factor)
+    overage_cents = money.to_cents(overage_gb * rate * factor)
+    total_cents = savings_plan_cents + overage_cents
+    return {
+        "on_demand_cost": money.to_dollars(on_demand_cents),
+        "savings_plan_cost": money.to_dollars(savings_plan_cents),
+        "overage_cost": money.to_dollars(overage_cents),
+        "waste_cost": money.to_dollars(money.to_cents(waste_gb * rate * (1 - discount) * factor)),
+        "total_cost": money.to_dollars(total_cents),
+        "savings_pct": money.percent(on_demand_cents - total_cents, on_demand_cents),
+        "utilization_pct": money.percent(covered_gb, capacity_gb),
+        "coverage_pct": money.percent(covered_gb, usage_gb),
+    }
@@ -0,0 +1,107 @@
+"""Min/max downsampling for long usage charts.
+
+A series is split into equal buckets, and each bucket keeps only its
+minimum and maximum hour. A chart never gets more than ``max_points``
+points, yet every spike and every dip stays visible. ``min_max_indices``
+does this in one vectorized pass over a whole series. ``StreamingMinMax``
+keeps the same kind of overview while a series grows one hour at a time:
+when its buckets run out, neighbouring pairs merge and the bucket width
+doubles. Adding an hour is O(1) amortized and memory is fixed.
+"""
+import numpy as np
+
+CHART_POINTS = 500  # Upper bound on points sent to a chart
+
+
+def _bucket_extremes(values, width):
+    """Indices of the minimum and maximum of each ``width``-long bucket"""
+    n = len(values)
+    buckets = -(-n // width)
+    pad = buckets * width - n
+    starts = np.arange(buckets) * width
+    lows = np.concatenate([values, np.full(pad, np.inf)]).reshape(buckets, width).argmin(axis=1)
+    highs = np.concatenate([values, np.full(pad, -np.inf)]).reshape(buckets, width).argmax(axis=1)
+    return starts + lows, starts + highs
+
+
+def min_max_indices(values, max_points=CHART_POINTS):
+    """Sorted indices of the minimum and maximum of each bucket (all indices for short series)"""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    lows, highs = _bucket_extremes(values, -(-n // (max_points // 2)))
+    return np.unique(np.concatenate([lows, highs]))
+
+
+class StreamingMinMax:
+    """Fixed-size min/max overview of a growing series"""
+
+    def __init__(self, max_points=CHART_POINTS):
+        self._size = max_points // 2 // 2 * 2  # Buckets; even so they can merge in pairs
+        self._lo = np.zeros(self._size)
+        self._hi = np.zeros(self._size)
+        self._lo_at = np.zeros(self._size, dtype=np.int64)
+        self._hi_at = np.zeros(self._size, dtype=np.int64)
+        self._width = 1
+        self._buckets = 0
+        self._fill = 0
+        self.count = 0
+
+    @classmethod
+    def from_series(cls, series, max_points=CHART_POINTS):
+        """Overview of a whole series, built in one vectorized pass"""
+        overview = cls(max_points)
+        series = np.asarray(series, dtype=np.float64)
+        n = len(series)
+        if not n:
+            return overview
+        while -(-n // overview._width) > overview._size:
+            overview._width *= 2
+        lows, highs = _bucket_extremes(series, overview._width)
+        buckets = len(lows)
+        overview._lo_at[:buckets], overview._lo[:buckets] = lows, series[lows]
+        overview._hi_at[:buckets], overview._hi[:buckets] = highs, series[highs]
+        overview._buckets = buckets
+        overview._fill = n - (buckets - 1) * overview._width
+        overview.count = n
+        return overview
+
+    def add(self, value):
+        """Fold the next hour into the overview"""
+        if self._buckets == 0 or self._fill == self._width:
+            if self._buckets == self._size:
+                self._merge_pairs()
+            b = self._buckets
+            self._buckets += 1
+            self._fill = 0
+            self._lo[b] = self._hi[b] = value
+            self._lo_at[b] = self._hi_at[b] = self.count
+        else:
+            b = self._buckets - 1
+            if value < self._lo[b]:
+                self._lo[b], self._lo_at[b] = value, self.count
+            if value > self._hi[b]:
+                self._hi[b], self._hi_at[b] = value, self.count
+        self._fill += 1
+        self.count += 1
+
+    def _merge_pairs(self):
+        """Halve the number of buckets by merging neighbours; all buckets are full here"""
+        lo, hi = self._lo.reshape(-1, 2), self._hi.reshape(-1, 2)
+        lo_at, hi_at = self._lo_at.reshape(-1, 2), self._hi_at.reshape(-1, 2)
+        rows = np.arange(len(lo))
+        pick_lo, pick_hi = lo.argmin(axis=1), hi.argmax(axis=1)
+        half = self._size // 2
+        self._lo[:half], self._lo_at[:half] = lo[rows, pick_lo], lo_at[rows, pick_lo]
+        self._hi[:half], self._hi_at[:half] = hi[rows, pick_hi], hi_at[rows, pick_hi]
+        self._buckets = half
+        self._width *= 2
+
+    def points(self):
+        """(hours, values) of the overview, in time order"""
+        n = self._buckets
+        hours = np.concatenate([self._lo_at[:n], self._hi_at[:n]])
+        values = np.concatenate([self._lo[:n], self._hi[:n]])
+        hours, first = np.unique(hours, return_index=True)
+        return hours, values[first]
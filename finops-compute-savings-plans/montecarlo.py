@@ -0,0 +1,121 @@
+"""Monte Carlo risk bands for a Savings Plan commitment.
+
+Many usage futures for a persona are simulated in batched NumPy draws. Each
+batch is a ``(paths, hours)`` array that is priced hour by hour with
+``costs.summarize`` and reduced to per-path totals straight away, so memory
+stays bounded. Every batch gets its own child ``SeedSequence``, so a run gives
+the same bills whether its batches run in this process or on a process pool
+(used for large runs). For interactive use, ``simulate_usage`` keeps the
+futures themselves as a compact float32 array. Each slider value is then
+priced on the same futures with a single pass (``price_paths``).
+
+Usage:
+    python montecarlo.py --paths 1000000 --commit 0.05
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import money
+from costs import DISCOUNT_RATE, ON_DEMAND_RATE, summarize
+from usage import PERSONAS, TERMS, generate_usage_series
+
+BATCH_PATHS = 1_000  # Paths per batch; bounds memory at BATCH_PATHS x hours floats
+PARALLEL_MIN_PATHS = 100_000  # Runs at least this large are spread over a process pool
+PERCENTILES = (5, 50, 95)
+
+_pool = None
+
+
+def _usage_batch(persona, paths, hours, seed_seq):
+    return generate_usage_series(persona, (paths, hours), np.random.default_rng(seed_seq)).astype(np.float32)
+
+
+def _simulate_batch(persona, paths, hours, seed_seq, commit, rate, discount):
+    """On-demand and Savings Plan bills (in cents) of ``paths`` futures of ``hours`` each"""
+    costs = summarize(_usage_batch(persona, paths, hours, seed_seq), commit, rate, discount)
+    return np.stack([money.to_cents(costs["on_demand_cost"]), money.to_cents(costs["total_cost"])])
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _pool
+
+
+def _batches(paths, seed):
+    sizes = [min(BATCH_PATHS, paths - start) for start in range(0, paths, BATCH_PATHS)]
+    return sizes, np.random.SeedSequence(seed).spawn(len(sizes))
+
+
+def simulate_usage(persona, paths, hours=TERMS["30 days"], seed=None):
+    """Simulate ``paths`` usage futures as one read-only float32 ``(paths, hours)`` array"""
+    sizes, seeds = _batches(paths, seed)
+    usage = np.concatenate([_usage_batch(persona, size, hours, seq) for size, seq in zip(sizes, seeds)])
+    usage.setflags(write=False)
+    return usage
+
+
+def price_paths(usage, commit, rate=ON_DEMAND_RATE, discount=DISCOUNT_RATE):
+    """On-Demand and Savings Plan bills (in cents) of simulated futures at ``commit``"""
+    bills = []
+    for start in range(0, len(usage), BATCH_PATHS):
+        costs = summarize(usage[start:start + BATCH_PATHS], commit, rate, discount)
+        bills.append(np.stack([money.to_cents(costs["on_demand_cost"]), money.to_cents(costs["total_cost"])]))
+    on_demand_cents, total_cents = np.concatenate(bills, axis=1)
+    return on_demand_cents, total_cents
+
+
+def simulate_costs(persona, commit, paths, hours=TERMS["30 days"], rate=ON_DEMAND_RATE,
+                   discount=DISCOUNT_RATE, seed=None, parallel=None):
+    """Simulate ``paths`` futures and return their On-Demand and Savings Plan bills in cents"""
+    batches, seeds = _batches(paths, seed)
+    if parallel is None:
+        parallel = paths >= PARALLEL_MIN_PATHS and (os.cpu_count() or 1) > 1
+    n = len(batches)
+    args = ([persona] * n, batches, [hours] * n, seeds, [commit] * n, [rate] * n, [discount] * n)
+    if parallel:
+        bills = _get_pool().map(_simulate_batch, *args, chunksize=max(1, n // (4 * os.cpu_count())))
+    else:
+        bills = map(_simulate_batch, *args)
+    on_demand_cents, total_cents = np.concatenate(list(bills), axis=1)
+    return on_demand_cents, total_cents
+
+
+def risk_bands(on_demand_cents, total_cents, percentiles=PERCENTILES):
+    """P5/P50/P95 (by default) total cost and savings% over simulated bills"""
+    savings_pct = money.percent(on_demand_cents - total_cents, on_demand_cents)
+    cost_bands = np.percentile(total_cents, percentiles)
+    savings_bands = np.percentile(savings_pct, percentiles)
+    return {
+        "total_cost": {p: money.to_dollars(round(c)) for p, c in zip(percentiles, cost_bands)},
+        "savings_pct": {p: float(s) for p, s in zip(percentiles, savings_bands)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo risk bands for a Savings Plan commitment")
+    parser.add_argument("--paths", type=int, default=10_000, help="Simulated futures per persona")
+    parser.add_argument("--commit", type=float, default=0.05, help="Hourly commitment ($)")
+    parser.add_argument("--term", choices=list(TERMS), default="30 days", help="Savings Plan term")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    args = parser.parse_args()
+
+    hours = TERMS[args.term]
+    for persona in PERSONAS:
+        start = time.perf_counter()
+        bills = simulate_costs(persona, args.commit, args.paths, hours, seed=args.seed)
+        elapsed = time.perf_counter() - start
+        bands = risk_bands(*bills)
+        cost = " / ".join(f"${bands['total_cost'][p]:,.2f}" for p in PERCENTILES)
+        savings = " / ".join(f"{bands['savings_pct'][p]:.1f}%" for p in PERCENTILES)
+        print(f"{persona['name']:<14} cost P5/P50/P95 {cost}  savings {savings}  "
+              f"({args.paths:,} paths in {elapsed * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Optimal Savings Plan commitment for a usage series.
+
+Usage is sorted once and its suffix sums are taken. Each candidate
+commitment's hourly overage, ``sum(max(usage - capacity, 0))``, is then a
+``searchsorted`` lookup. So every slider commitment is priced in a single
+vectorized pass (O(n log n) once, then O(log n) per candidate), and the
+result is the whole cost curve plus its minimum. Costs follow the
+hour-granular rules and cent rounding in ``costs.py``, so the optimum can
+be compared directly with the player's bill.
+"""
+import numpy as np
+
+import money
+from costs import DISCOUNT_RATE, ON_DEMAND_RATE, coverage_gb
+
+MAX_COMMIT = 0.5  # $/hour, the slider maximum
+COMMIT_STEP = 0.01
+
+
+def commitment_candidates(max_commit=MAX_COMMIT, step=COMMIT_STEP):
+    """Every commitment the slider can select, in $/hour"""
+    return np.round(np.arange(round(max_commit / step) + 1) * step, 10)
+
+
+def cost_curve(usage, rate=ON_DEMAND_RATE, discount=DISCOUNT_RATE, candidates=None, weights=None):
+    """Total cost (in cents) of each candidate commitment over the hours in ``usage``.
+
+    ``weights`` counts how many hours each usage value stands for, so a
+    histogram of the series can be priced instead of the series itself.
+    """
+    candidates = commitment_candidates() if candidates is None else np.asarray(candidates, dtype=np.float64)
+    usage = np.asarray(usage, dtype=np.float64)
+    weights = np.ones(len(usage)) if weights is None else np.asarray(weights, dtype=np.float64)
+    order = np.argsort(usage)
+    values = usage[order]
+    # Hours and usage at or after each sorted position
+    hours_above = np.append(np.cumsum(weights[order][::-1])[::-1], 0.0)
+    usage_above = np.append(np.cumsum((values * weights[order])[::-1])[::-1], 0.0)
+    hours = round(float(hours_above[0]))
+
+    capacity = coverage_gb(candidates, rate, discount)
+    first_above = np.searchsorted(values, capacity, side="right")
+    overage_gb = usage_above[first_above] - capacity * hours_above[first_above]
+
+    on_demand_cents = money.to_cents(float(usage_above[0]) * rate)
+    total_cents = money.to_cents(candidates) * hours + money.to_cents(overage_gb * rate)
+    best = int(np.argmin(total_cents))
+    return {
+        "candidates": candidates,
+        "total_cents": total_cents,
+        "on_demand_cents": on_demand_cents,
+        "best_commit": float(candidates[best]),
+        "best_cents": int(total_cents[best]),
+    }
+
+
+def gap_from_optimal(total_cents, best_cents):
+    """How far a bill is above the optimum, as a percentage of the optimum"""
+    return money.percent(total_cents - best_cents, best_cents)
@@ -0,0 +1,108 @@
+"""Time-aware usage generation for Cloud Cost Hero.
+
+Personas are declared as plain dicts. Their deterministic shape, made of a
+diurnal cycle, weekday/weekend levels and a growth trend, is composed into
+a per-hour template of usage level and spike probability. The template is
+built once per persona and cached. Drawing a series is then a handful of
+vectorized operations on top of the template: one uniform draw per hour
+for spikes and, optionally, multiplicative Gaussian noise. Hour 0 is
+midnight on a Monday. ``size`` may also be a ``(paths, hours)`` tuple to
+draw many series in one call.
+
+A game's series is identified by ``(persona, seed)`` alone: ``seeded_series``
+draws each week from its own ``default_rng([seed, week])``, so any window of
+hours can be regenerated on demand and always comes out the same.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+HOURS_PER_DAY = 24
+HOURS_PER_MONTH = 30 * HOURS_PER_DAY
+BLOCK_HOURS = 7 * HOURS_PER_DAY  # Hours drawn from each seeded random stream
+
+# Savings Plan term -> simulated hours
+TERMS = {
+    "30 days": 30 * HOURS_PER_DAY,
+    "1 year": 365 * HOURS_PER_DAY,
+    "3 years": 3 * 365 * HOURS_PER_DAY,
+}
+
+# Pattern fields a persona may set, with their defaults
+PATTERN_DEFAULTS = {
+    "diurnal_amplitude": 0.0,  # Daily swing as a fraction of the base rate
+    "peak_hour": 14,  # Hour of day with the highest usage
+    "weekend_factor": 1.0,  # Usage level on Saturday and Sunday relative to weekdays
+    "weekend_spike_prob": None,  # Spike probability on weekends (default: spike_prob)
+    "trend_per_month": 0.0,  # Growth of the usage level per 30 days
+    "noise": 0.0,  # Relative standard deviation of hour-to-hour noise
+}
+
+PERSONAS = [
+    {"name": "Steady SaaS", "base_rate": 2.0, "spike_prob": 0.15, "spike_factor": 2.0,
+     "diurnal_amplitude": 0.25, "peak_hour": 14, "weekend_factor": 0.85, "trend_per_month": 0.03, "noise": 0.05},
+    {"name": "Spiky Batch", "base_rate": 1.0, "spike_prob": 0.35, "spike_factor": 4.0,
+     "diurnal_amplitude": 0.1, "peak_hour": 2, "noise": 0.1},
+    {"name": "Weekend Peak", "base_rate": 1.5, "spike_prob": 0.15, "spike_factor": 3.5,
+     "weekend_factor": 1.4, "weekend_spike_prob": 0.4, "diurnal_amplitude": 0.15, "peak_hour": 20, "noise": 0.05},
+]
+
+# Templates cover the longest term so live play can slice them hour by hour
+TEMPLATE_HOURS = max(TERMS.values())
+
+
+def new_seed():
+    """Pick a seed for a new game"""
+    return int(np.random.SeedSequence().generate_state(1, np.uint64)[0] >> 1)
+
+
+def _pattern_key(persona):
+    """Hashable key of the fields that shape a persona's template"""
+    pattern = {**PATTERN_DEFAULTS, **persona}
+    return (pattern["base_rate"], pattern["spike_prob"], pattern["diurnal_amplitude"], pattern["peak_hour"],
+            pattern["weekend_factor"], pattern["weekend_spike_prob"], pattern["trend_per_month"])
+
+
+@lru_cache(maxsize=64)
+def _template(key, hours):
+    base_rate, spike_prob, diurnal, peak_hour, weekend_factor, weekend_spike_prob, trend = key
+    hour = np.arange(hours)
+    weekend = (hour // HOURS_PER_DAY) % 7 >= 5
+    level = base_rate * (1 + diurnal * np.cos(2 * np.pi * (hour % HOURS_PER_DAY - peak_hour) / HOURS_PER_DAY))
+    level *= np.where(weekend, weekend_factor, 1.0)
+    level *= 1 + trend * hour / HOURS_PER_MONTH
+    if weekend_spike_prob is None:
+        weekend_spike_prob = spike_prob
+    spike_prob = np.where(weekend, weekend_spike_prob, spike_prob).astype(np.float32)
+    level.setflags(write=False)
+    spike_prob.setflags(write=False)
+    return level, spike_prob
+
+
+def usage_template(persona, start=0, hours=TEMPLATE_HOURS):
+    """Expected usage level (before spikes and noise) and spike probability per hour"""
+    level, spike_prob = _template(_pattern_key(persona), max(TEMPLATE_HOURS, start + hours))
+    return level[start:start + hours], spike_prob[start:start + hours]
+
+
+def generate_usage_series(persona, size, rng, start=0):
+    """Generate hourly RAM usage (GB) for ``size`` hours (or a (paths, hours) shape) from hour ``start``"""
+    hours = size[-1] if isinstance(size, tuple) else size
+    level, spike_prob = usage_template(persona, start, hours)
+    spikes = rng.random(size, dtype=np.float32) < spike_prob
+    usage = level * np.where(spikes, persona["spike_factor"], 1.0)
+    noise = persona.get("noise", PATTERN_DEFAULTS["noise"])
+    if noise:
+        usage *= np.maximum(1 + noise * rng.standard_normal(size, dtype=np.float32), 0.0)
+    return usage
+
+
+def seeded_series(persona, seed, start, hours):
+    """Hours ``start`` to ``start + hours`` of the series identified by ``(persona, seed)``"""
+    first, last = start // BLOCK_HOURS, (start + max(hours, 1) - 1) // BLOCK_HOURS
+    blocks = [
+        generate_usage_series(persona, BLOCK_HOURS, np.random.default_rng([seed, block]), start=block * BLOCK_HOURS)
+        for block in range(first, last + 1)
+    ]
+    offset = start - first * BLOCK_HOURS
+    return np.concatenate(blocks)[offset:offset + hours]
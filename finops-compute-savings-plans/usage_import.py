@@ -0,0 +1,225 @@
+"""Streaming import of real hourly usage (CSV or Parquet, e.g. AWS CUR exports).
+
+The export is read in chunks, keeping only the timestamp, usage and group
+columns plus any filter columns. Each chunk is filtered and summed per
+(group, hour) before the next chunk is read, so memory depends on the
+number of groups x hours and not on the file size. Rows with a blank or
+unparseable timestamp or usage are dropped and counted. The result is a dense
+``groups x hours`` matrix. It is cached in a compact ``.npz`` file keyed by
+the source file's path, size and modification time and by the import
+options, so importing the same export again is instant.
+
+Usage:
+    python usage_import.py cur-export.parquet --filter lineItem/UsageType=GB-Hours
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 200_000
+NS_PER_HOUR = 3600 * 10**9
+DEFAULT_CACHE_DIR = os.environ.get(
+    "COST_HERO_USAGE_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "cloud-cost-hero")
+)
+
+EXPORT_SUFFIXES = (".csv", ".csv.gz", ".parquet")
+
+# Column names tried when none is given: CUR (legacy), CUR 2.0, then generic
+TIME_COLUMNS = ["lineItem/UsageStartDate", "line_item_usage_start_date", "timestamp", "time", "hour"]
+VALUE_COLUMNS = ["lineItem/UsageAmount", "line_item_usage_amount", "usage", "value"]
+
+
+class HourlyUsage:
+    """Dense hourly usage per group (account, service, ...)"""
+
+    __slots__ = ("groups", "start_hour", "usage", "dropped_rows")
+
+    def __init__(self, groups, start_hour, usage, dropped_rows=0):
+        self.groups = list(groups)
+        self.start_hour = int(start_hour)  # Hours since the Unix epoch (UTC)
+        self.usage = usage  # float64 array, groups x hours
+        self.dropped_rows = int(dropped_rows)  # Rows skipped for a missing/invalid timestamp or usage
+
+    @property
+    def start(self):
+        return pd.Timestamp(self.start_hour * NS_PER_HOUR, tz="UTC")
+
+    @property
+    def hours(self):
+        return self.usage.shape[1]
+
+    def series(self, group):
+        """Hourly usage of one group"""
+        return self.usage[self.groups.index(group)]
+
+    def save(self, path):
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(tmp_path, groups=np.array(self.groups, dtype=str),
+                            start_hour=np.int64(self.start_hour), usage=self.usage,
+                            dropped_rows=np.int64(self.dropped_rows))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            dropped_rows = data["dropped_rows"] if "dropped_rows" in data else 0
+            return cls(data["groups"].tolist(), data["start_hour"], data["usage"], dropped_rows)
+
+
+def _pick(columns, requested, candidates, what):
+    if requested:
+        if requested not in columns:
+            raise ValueError(f"{what} column {requested!r} not found in the export")
+        return requested
+    for name in candidates:
+        if name in columns:
+            return name
+    raise ValueError(f"No {what} column found; pass one explicitly (tried {', '.join(candidates)})")
+
+
+def _read_columns(path):
+    if path.endswith(".parquet"):
+        return _parquet(path).schema_arrow.names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _parquet(path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet exports requires pyarrow (pip install pyarrow)") from e
+    return pq.ParquetFile(path)
+
+
+def _chunks(path, columns, chunk_rows):
+    """Yield DataFrames of ``columns`` from a CSV or Parquet file"""
+    if path.endswith(".parquet"):
+        for batch in _parquet(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_rows, dtype={c: str for c in columns[2:]})
+
+
+def _aggregate(chunk, time_col, value_col, group_col, filters):
+    """Sum one chunk's usage per (group, hour); return the sums and the number of invalid rows dropped"""
+    keep = np.ones(len(chunk), dtype=bool)
+    for column, needle in filters.items():
+        keep &= chunk[column].astype(str).str.contains(needle, regex=False).to_numpy()
+    chunk = chunk[keep]
+    hours = pd.to_datetime(chunk[time_col], utc=True, format="ISO8601", errors="coerce").to_numpy(dtype="datetime64[ns]")
+    usage = pd.to_numeric(chunk[value_col], errors="coerce").to_numpy(dtype=np.float64)
+    # NaT would become hour -2562048 (year 1677) and stretch the series across centuries
+    valid = ~np.isnat(hours) & np.isfinite(usage)
+    frame = pd.DataFrame({
+        "group": chunk[group_col].astype(str).to_numpy()[valid] if group_col else "all",
+        "hour": hours[valid].astype(np.int64) // NS_PER_HOUR,
+        "usage": usage[valid],
+    })
+    return frame.groupby(["group", "hour"], sort=False)["usage"].sum(), int((~valid).sum())
+
+
+def import_usage(path, time_col=None, value_col=None, group_col=None, filters=None, chunk_rows=CHUNK_ROWS):
+    """Read a usage export in chunks and aggregate it to hourly usage per group"""
+    filters = filters or {}
+    available = _read_columns(path)
+    time_col = _pick(available, time_col, TIME_COLUMNS, "timestamp")
+    value_col = _pick(available, value_col, VALUE_COLUMNS, "usage")
+    if group_col is not None:
+        group_col = _pick(available, group_col, [], "group")
+    for column in filters:
+        _pick(available, column, [], "filter")
+    columns = list(dict.fromkeys([time_col, value_col, *([group_col] if group_col else []), *filters]))
+
+    partials = []
+    dropped = 0
+    for chunk in _chunks(path, columns, chunk_rows):
+        sums, invalid = _aggregate(chunk, time_col, value_col, group_col, filters)
+        partials.append(sums)
+        dropped += invalid
+        if len(partials) >= 16:
+            partials = [pd.concat(partials).groupby(level=[0, 1]).sum()]
+    if not partials:
+        raise ValueError("The export has no rows")
+    totals = pd.concat(partials).groupby(level=[0, 1]).sum()
+    if totals.empty:
+        if dropped:
+            raise ValueError(f"No valid rows: {dropped:,} rows had a blank or unparseable {time_col} or {value_col}")
+        raise ValueError("No rows matched the filters")
+
+    groups = sorted(totals.index.get_level_values(0).unique())
+    hour_index = totals.index.get_level_values(1).to_numpy()
+    start_hour = int(hour_index.min())
+    usage = np.zeros((len(groups), int(hour_index.max()) - start_hour + 1))
+    rows = pd.Index(groups).get_indexer(totals.index.get_level_values(0))
+    usage[rows, hour_index - start_hour] = totals.to_numpy()
+    return HourlyUsage(groups, start_hour, usage, dropped)
+
+
+def cache_path(path, cache_dir=DEFAULT_CACHE_DIR, **options):
+    """Cache file for an export and import options (changes when the file does)"""
+    stat = os.stat(path)
+    key = json.dumps([os.path.abspath(path), stat.st_size, stat.st_mtime_ns, options], sort_keys=True, default=str)
+    digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-{digest}.npz")
+
+
+def load_hourly_usage(path, time_col=None, value_col=None, group_col=None, filters=None,
+                      cache_dir=DEFAULT_CACHE_DIR):
+    """``import_usage`` with the result cached in ``cache_dir``"""
+    options = {"time_col": time_col, "value_col": value_col, "group_col": group_col, "filters": filters or {}}
+    cached = cache_path(path, cache_dir, **options)
+    if os.path.exists(cached):
+        return HourlyUsage.load(cached)
+    hourly = import_usage(path, **options)
+    os.makedirs(cache_dir, exist_ok=True)
+    hourly.save(cached)
+    return hourly
+
+
+def list_exports(directory):
+    """Names of the CSV/Parquet files directly inside ``directory``"""
+    with os.scandir(directory) as entries:
+        return sorted(entry.name for entry in entries if entry.is_file() and entry.name.endswith(EXPORT_SUFFIXES))
+
+
+def parse_filters(pairs):
+    """Turn ``COLUMN=TEXT`` strings into a filters dict"""
+    filters = {}
+    for pair in pairs:
+        column, sep, needle = pair.partition("=")
+        if not sep:
+            raise ValueError(f"Filter {pair!r} must look like COLUMN=TEXT")
+        filters[column] = needle
+    return filters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate a CSV/Parquet usage export to hourly usage series")
+    parser.add_argument("path", help="CSV or Parquet usage export (e.g. AWS CUR)")
+    parser.add_argument("--time-col", help="Usage start timestamp column")
+    parser.add_argument("--value-col", help="Usage amount column")
+    parser.add_argument("--group-col", help="Column to split series by (e.g. lineItem/UsageAccountId)")
+    parser.add_argument("--filter", action="append", default=[], metavar="COLUMN=TEXT",
+                        help="Keep rows whose COLUMN contains TEXT (repeatable)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Where imported series are cached")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    hourly = load_hourly_usage(args.path, args.time_col, args.value_col, args.group_col,
+                               parse_filters(args.filter), args.cache_dir)
+    print(f"{len(hourly.groups)} series x {hourly.hours:,} hours from {hourly.start:%Y-%m-%d %H:%M} UTC "
+          f"in {time.perf_counter() - start:.1f}s")
+    if hourly.dropped_rows:
+        print(f"Skipped {hourly.dropped_rows:,} rows with a blank or unparseable timestamp or usage")
+    for group, series in zip(hourly.groups, hourly.usage):
+        print(f"  {group:<24} avg {series.mean():8.2f}  peak {series.max():8.2f}  total {series.sum():,.1f}")
+
+
+if __name__ == "__main__":
+    main()
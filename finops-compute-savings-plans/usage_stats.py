@@ -0,0 +1,124 @@
+"""Running usage statistics for the live panel.
+
+``UsageStats`` folds each simulated hour into a running count, sum, min, max
+and Welford mean/variance, and keeps the most recent hours in a fixed-size
+ring buffer for spike detection, plus a fixed-size min/max overview of the
+whole history for the chart. A fixed-bin histogram
+(count and usage sum per bin) stands in for the series when pricing a
+commitment hour by hour. Hourly cost is linear in usage on either side of the
+commitment's coverage, so pricing a bin at its mean usage is exact except for
+the one bin straddling the coverage, whose error is bounded by the bin width.
+The width is 0.01 GB by default and grows with the expected peak
+(``bin_width``), so usage above the histogram's range never piles up in its
+last bin. Its arrays only grow to the highest bin used, which keeps the
+object small enough to sit in session state. Adding an hour is O(1) (amortized), and reading the window or the
+histogram costs O(window) or O(bins), however long the series grows.
+"""
+import math
+
+import numpy as np
+
+from downsample import StreamingMinMax
+
+CHART_WINDOW = 50  # Recent hours kept for spike detection
+HIST_BIN_GB = 0.01  # Default histogram bin width
+HIST_BINS = 6400  # Bins at most; values above the last bin's range land in it
+
+
+def bin_width(peak):
+    """Histogram bin width that keeps usage up to ``peak`` GB inside ``HIST_BINS`` bins"""
+    return max(HIST_BIN_GB, float(peak) / (HIST_BINS - 1))
+
+
+class UsageStats:
+    """Incremental usage accumulator with a ring buffer of recent hours"""
+
+    def __init__(self, window=CHART_WINDOW, bin_gb=HIST_BIN_GB):
+        self.bin_gb = bin_gb
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._ring = np.zeros(window)
+        self._pos = 0
+        self._bin_counts = np.zeros(0, dtype=np.int32)
+        self._bin_sums = np.zeros(0)
+        self._overview = StreamingMinMax()
+
+    @classmethod
+    def from_series(cls, series, window=CHART_WINDOW):
+        """Build the statistics of a whole series in one vectorized pass, with bins sized to its peak"""
+        series = np.asarray(series, dtype=np.float64)
+        stats = cls(window, bin_width(series.max()) if len(series) else HIST_BIN_GB)
+        if len(series):
+            stats.count = len(series)
+            stats.total = float(series.sum())
+            stats.mean = stats.total / stats.count
+            stats._m2 = float(np.square(series - stats.mean).sum())
+            stats.min = float(series.min())
+            stats.max = float(series.max())
+            tail = series[-window:]
+            stats._ring[:len(tail)] = tail
+            stats._pos = len(tail) % window
+            bins = np.minimum((series / stats.bin_gb).astype(np.int64), HIST_BINS - 1)
+            stats._bin_counts = np.bincount(bins).astype(np.int32)
+            stats._bin_sums = np.bincount(bins, weights=series)
+            stats._overview = StreamingMinMax.from_series(series)
+        return stats
+
+    def add(self, value):
+        """Fold one hour of usage into the statistics"""
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self._ring[self._pos] = value
+        self._pos = (self._pos + 1) % len(self._ring)
+        b = min(int(value / self.bin_gb), HIST_BINS - 1)
+        if b >= len(self._bin_counts):
+            self._grow_bins(min(max(b + 1, 2 * len(self._bin_counts)), HIST_BINS))
+        self._bin_counts[b] += 1
+        self._bin_sums[b] += value
+        self._overview.add(value)
+
+    def _grow_bins(self, size):
+        counts = np.zeros(size, dtype=np.int32)
+        counts[:len(self._bin_counts)] = self._bin_counts
+        sums = np.zeros(size)
+        sums[:len(self._bin_sums)] = self._bin_sums
+        self._bin_counts, self._bin_sums = counts, sums
+
+    @property
+    def variance(self):
+        """Population variance of the usage so far"""
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def last(self):
+        return float(self._ring[self._pos - 1]) if self.count else None
+
+    def window(self, n=None):
+        """The most recent ``n`` hours (default: the whole ring), oldest first"""
+        size = min(self.count, len(self._ring))
+        n = size if n is None else min(n, size)
+        if self.count < len(self._ring):
+            return self._ring[size - n:size].copy()
+        return np.roll(self._ring, -self._pos)[len(self._ring) - n:]
+
+    def histogram(self):
+        """Mean usage and hour count of each non-empty histogram bin"""
+        filled = self._bin_counts > 0
+        return self._bin_sums[filled] / self._bin_counts[filled], self._bin_counts[filled]
+
+    def overview(self):
+        """(hours, usage) min/max overview of the whole history, capped at a fixed number of points"""
+        return self._overview.points()
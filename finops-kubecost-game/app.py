@@ -1,8 +1,15 @@
 import streamlit as st
-import random
+import concurrent.futures
+import os
+import re
 from typing import Dict, List, Optional
 import pandas as pd
 
+import cluster_model
+import kubecost_client
+import money
+from scenario_graph import ScenarioGraph
+
 # Page configuration
 st.set_page_config(
     page_title="Kubecost FinOps Detective 🕵️‍♂️",
@@ -102,187 +109,34 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Game scenarios data
-def get_scenarios():
-    return {
-        "stage1": {
-            "description": "Your Kubernetes cluster monthly cost is **${cost}**. Kubecost shows unusually high usage patterns across namespaces.",
-            "data": {
-                "Namespace": ["prod", "dev", "staging"],
-                "Monthly Cost": ["${prod_cost}", "${dev_cost}", "${stage_cost}"],
-                "CPU Efficiency": ["40%", "70%", "55%"],
-                "Memory Efficiency": ["35%", "65%", "50%"]
-            },
-            "choices": [
-                {
-                    "text": "🔍 Drill into 'prod' namespace for detailed analysis",
-                    "points": 100,
-                    "next": "stage2",
-                    "feedback": "✅ Excellent! In FinOps, visibility is the first step. Kubecost's namespace drill-down reveals resource waste."
-                },
-                {
-                    "text": "⚡ Immediately scale down all namespaces by 50%",
-                    "points": -50,
-                    "next": "stage2",
-                    "feedback": "❌ Risky move! Without data-driven insights, you might break production. Always analyze before acting."
-                },
-                {
-                    "text": "📊 Check workload-level costs first",
-                    "points": 50,
-                    "next": "stage2",
-                    "feedback": "🔍 Good approach! Workload analysis helps, but namespace view gives better initial overview."
-                },
-                {
-                    "text": "🔔 Set budget alerts without investigation",
-                    "points": -25,
-                    "next": "stage2",
-                    "feedback": "⚠️ Premature! Alerts without understanding baseline costs lead to noise. Investigate first."
-                }
-            ]
-        },
-        "stage2": {
-            "description": "Drilling into the 'prod' namespace, Kubecost reveals several deployments with concerning metrics:",
-            "data": {
-                "Workload": ["api-server", "data-processor", "legacy-app"],
-                "Monthly Cost": ["${api_cost}", "${data_cost}", "${legacy_cost}"],
-                "CPU Request": ["4000m", "8000m", "2000m"],
-                "CPU Usage": ["800m", "7500m", "100m"],
-                "Memory Request": ["8Gi", "16Gi", "4Gi"],
-                "Memory Usage": ["2Gi", "15Gi", "0.5Gi"]
-            },
-            "choices": [
-                {
-                    "text": "💰 Rightsize api-server and legacy-app immediately",
-                    "points": 100,
-                    "next": "stage3",
-                    "feedback": "💰 Perfect! These show clear overprovisioning. Kubecost's efficiency metrics guide rightsizing decisions."
-                },
-                {
-                    "text": "🗑️ Delete legacy-app without checking dependencies",
-                    "points": -75,
-                    "next": "stage3",
-                    "feedback": "🚫 Dangerous! Even idle resources might be critical. Check dependencies and usage patterns first."
-                },
-                {
-                    "text": "📈 Increase data-processor resources (it's near limits)",
-                    "points": -50,
-                    "next": "stage3",
-                    "feedback": "📈 Counterproductive! This would increase costs. The workload is efficiently using resources."
-                },
-                {
-                    "text": "💾 Export Kubecost data for offline analysis",
-                    "points": 25,
-                    "next": "stage3",
-                    "feedback": "⏱️ Valid but slow. Kubecost enables real-time decisions. Act on clear inefficiencies now!"
-                }
-            ]
-        },
-        "stage3": {
-            "description": "After rightsizing, you discover untagged resources making cost allocation difficult. Kubecost shows:",
-            "data": {
-                "Resource Type": ["Deployments", "Services", "PVCs"],
-                "Count": [45, 60, 30],
-                "Monthly Cost": ["${deploy_cost}", "${svc_cost}", "${pvc_cost}"],
-                "Tagged %": ["20%", "15%", "5%"],
-                "Team Owner": ["Unknown", "Unknown", "Unknown"]
-            },
-            "choices": [
-                {
-                    "text": "🏷️ Implement mandatory tagging policy with team/cost-center labels",
-                    "points": 100,
-                    "next": "stage4",
-                    "feedback": "🏷️ Excellent! Proper tagging enables Kubecost's cost allocation features for accountability."
-                },
-                {
-                    "text": "✏️ Manually assign costs based on namespace names",
-                    "points": 25,
-                    "next": "stage4",
-                    "feedback": "📊 Temporary fix. Automated tagging scales better and integrates with Kubecost reports."
-                },
-                {
-                    "text": "🚫 Ignore tagging and focus on total cost only",
-                    "points": -50,
-                    "next": "stage4",
-                    "feedback": "❌ Short-sighted! Without allocation, teams lack ownership of their costs. FinOps requires accountability."
-                },
-                {
-                    "text": "💥 Delete all untagged resources",
-                    "points": -100,
-                    "next": "stage4",
-                    "feedback": "💥 Catastrophic! This would cause outages. Tagging should be enforced, not destructive."
-                }
-            ]
-        },
-        "stage4": {
-            "description": "With better visibility, you notice usage patterns. Kubecost's recommendations engine suggests:",
-            "data": {
-                "Optimization Type": ["Spot Instances (dev)", "Reserved Instances", "Autoscaling (HPA/VPA)", "Off-hours Scaling"],
-                "Potential Savings": ["${spot_save}/mo", "${ri_save}/mo", "${auto_save}/mo", "${offhour_save}/mo"],
-                "Implementation Effort": ["Medium", "Low", "High", "Medium"],
-                "Risk Level": ["Low", "Very Low", "Medium", "Low"]
-            },
-            "choices": [
-                {
-                    "text": "🎯 Implement Spot instances for dev/staging environments",
-                    "points": 100,
-                    "next": "stage5",
-                    "feedback": "🎯 Smart choice! Spot instances are perfect for non-critical workloads. Kubecost tracks spot savings."
-                },
-                {
-                    "text": "📅 Purchase 3-year Reserved Instances for everything",
-                    "points": -25,
-                    "next": "stage5",
-                    "feedback": "📅 Too aggressive! Start with 1-year RIs for stable workloads. Kubecost helps identify candidates."
-                },
-                {
-                    "text": "📈 Enable aggressive autoscaling on all workloads",
-                    "points": 50,
-                    "next": "stage5",
-                    "feedback": "📈 Good but risky! Test autoscaling gradually. Kubecost monitors scaling impact on costs."
-                },
-                {
-                    "text": "🔄 Implement all optimizations simultaneously",
-                    "points": -50,
-                    "next": "stage5",
-                    "feedback": "🔄 Overwhelming! Phased approach reduces risk. Kubecost tracks each optimization's impact."
-                }
-            ]
-        },
-        "stage5": {
-            "description": "Final step: Establishing ongoing FinOps practices. Kubecost offers these monitoring features:",
-            "data": {
-                "Feature": ["Budget Alerts", "Efficiency Reports", "Cost Allocation", "Savings Tracking"],
-                "Purpose": ["Proactive cost control", "Continuous optimization", "Team accountability", "Measure FinOps impact"],
-                "FinOps Pillar": ["Operate", "Optimize", "Inform", "All"]
-            },
-            "choices": [
-                {
-                    "text": "📊 Set up weekly efficiency reports and monthly budget reviews",
-                    "points": 100,
-                    "next": "end",
-                    "feedback": "🎉 Perfect! Regular cadence ensures continuous FinOps improvement. Kubecost automates this!"
-                },
-                {
-                    "text": "⚠️ Create alerts for 200% budget overrun only",
-                    "points": -25,
-                    "next": "end",
-                    "feedback": "⚠️ Too late! Earlier alerts (e.g., 80%) enable proactive action. Kubecost supports multiple thresholds."
-                },
-                {
-                    "text": "👤 Assign FinOps to one person part-time",
-                    "points": 25,
-                    "next": "end",
-                    "feedback": "👥 Okay start, but FinOps needs cross-functional collaboration. Kubecost dashboards enable team self-service."
-                },
-                {
-                    "text": "📉 Rely on quarterly manual reviews",
-                    "points": -50,
-                    "next": "end",
-                    "feedback": "📉 Insufficient! Cloud costs change daily. Kubecost's real-time monitoring is essential."
-                }
-            ]
-        }
-    }
+# ${name} placeholders in scenario text, filled from st.session_state.stage_data
+PLACEHOLDER = re.compile(r"\$\{(\w+)\}")
+
+# With KUBECOST_URL set (e.g. the mock_kubecost server), namespace costs come from its allocation API
+# and every player investigates the same cluster, KUBECOST_CLUSTER
+KUBECOST_URL = os.environ.get("KUBECOST_URL")
+KUBECOST_CLUSTER = int(os.environ.get("KUBECOST_CLUSTER", "0"))
+
+@st.cache_resource(max_entries=32)
+def get_cluster(seed: int) -> cluster_model.Cluster:
+    """The synthetic cluster of a game, rebuilt from its seed when evicted"""
+    return cluster_model.build_cluster(seed)
+
+@st.cache_resource
+def get_kubecost() -> kubecost_client.KubecostClient:
+    """One pooled, caching API client shared by every session"""
+    return kubecost_client.KubecostClient(KUBECOST_URL)
+
+def get_namespace_costs(seed: int) -> pd.DataFrame:
+    """Monthly cost and efficiency per namespace, from the Kubecost API when configured"""
+    if KUBECOST_URL:
+        client = get_kubecost()
+        try:
+            allocation = client.get(client.allocation(window="7d", aggregate="namespace", cluster=seed))
+            return kubecost_client.namespace_costs(allocation, namespaces=list(cluster_model.NAMESPACES))
+        except (kubecost_client.KubecostError, concurrent.futures.TimeoutError) as e:
+            st.warning(f"Kubecost API unavailable ({e}); showing the simulated cluster instead.")
+    return cluster_model.namespace_costs(get_cluster(seed))
 
 # Initialize session state
 if 'current_stage' not in st.session_state:
@@ -293,25 +147,9 @@ if 'current_stage' not in st.session_state:
     st.session_state.feedback = None
     st.session_state.stage_data = {}
     
-    # Randomize costs
-    multiplier = random.uniform(0.9, 1.1)
-    base_costs = {
-        "cost": 5000,
-        "prod_cost": 3000,
-        "dev_cost": 1500,
-        "stage_cost": 500,
-        "api_cost": 1200,
-        "data_cost": 1500,
-        "legacy_cost": 300,
-        "deploy_cost": 2500,
-        "svc_cost": 1000,
-        "pvc_cost": 1500,
-        "spot_save": 800,
-        "ri_save": 1200,
-        "auto_save": 600,
-        "offhour_save": 400
-    }
-    st.session_state.stage_data = {k: int(v * multiplier) for k, v in base_costs.items()}
+    # Each game investigates its own synthetic cluster; only the seed lives in the session
+    st.session_state.cluster_seed = KUBECOST_CLUSTER if KUBECOST_URL else cluster_model.new_seed()
+    st.session_state.stage_data = cluster_model.stage_values(get_namespace_costs(st.session_state.cluster_seed))
 
 def calculate_badges():
     """Calculate badges based on performance"""
@@ -335,18 +173,69 @@ def calculate_badges():
     
     return badges
 
+class _Values(dict):
+    """Placeholder values; unknown placeholders are left in the text"""
+
+    def __missing__(self, key):
+        return f"{{{key}}}"
+
+def compile_template(text: str, keep_dollar: bool) -> str:
+    """Turn ${name} placeholders into a str.format_map template (optionally keeping the "$")"""
+    parts = PLACEHOLDER.split(text)
+    # split() alternates literal text and placeholder names
+    return "".join(
+        part.replace("{", "{{").replace("}", "}}") if i % 2 == 0 else ("$" if keep_dollar else "") + f"{{{part}}}"
+        for i, part in enumerate(parts)
+    )
+
+def compile_scenario(scenario: Dict) -> Dict:
+    """Compile a scenario's description and report cells into templates"""
+    compiled = dict(scenario)
+    compiled["description"] = compile_template(scenario["description"], keep_dollar=False)
+    if scenario.get("data"):
+        # Cells are (template, True) or (value, False) when there is nothing to fill in
+        compiled["data"] = {
+            column: [
+                (compile_template(value, keep_dollar=True), True)
+                if isinstance(value, str) and PLACEHOLDER.search(value) else (value, False)
+                for value in values
+            ]
+            for column, values in scenario["data"].items()
+        }
+    return compiled
+
+@st.cache_resource
+def get_graph() -> ScenarioGraph:
+    """The validated scenario graph, loaded once per process"""
+    return ScenarioGraph.load()
+
+@st.cache_resource
+def get_stage(stage: str) -> Dict:
+    """A stage's content with compiled templates, loaded on first visit"""
+    return compile_scenario(get_graph().content(stage))
+
+def fill_template(template: str, values: Dict[str, any]) -> str:
+    """Substitute all placeholders in a compiled template in one pass"""
+    return template.format_map(_Values(values))
+
 def format_data_with_values(data: Dict, values: Dict[str, any]) -> pd.DataFrame:
-    """Replace placeholders in data with actual values"""
-    formatted_data = {}
-    for key, value_list in data.items():
-        formatted_list = []
-        for value in value_list:
-            if isinstance(value, str) and "${" in value:
-                for var_name, var_value in values.items():
-                    value = value.replace(f"${{{var_name}}}", f"${var_value}")
-            formatted_list.append(value)
-        formatted_data[key] = formatted_list
-    return pd.DataFrame(formatted_data)
+    """Fill a compiled report's placeholders with actual values"""
+    values = _Values(values)
+    return pd.DataFrame({
+        column: [cell.format_map(values) if is_template else cell for cell, is_template in cells]
+        for column, cells in data.items()
+    })
+
+# API-backed reports expire with the client's cache instead of living as long as the process
+@st.cache_data(max_entries=1000, ttl=kubecost_client.DEFAULT_TTL if KUBECOST_URL else None)
+def stage_report(stage: str, seed: int, fingerprint: tuple) -> pd.DataFrame:
+    """A stage's Kubecost report, memoized per cluster seed and stage_data fingerprint"""
+    current = get_stage(stage)
+    if current.get("report") == "namespaces":
+        return cluster_model.namespace_table(get_namespace_costs(seed))
+    if current.get("report"):
+        return cluster_model.REPORTS[current["report"]](get_cluster(seed))
+    return format_data_with_values(current["data"], dict(fingerprint))
 
 def show_intro():
     """Display introduction screen"""
@@ -367,7 +256,7 @@ def show_intro():
         """, unsafe_allow_html=True)
     
     with col2:
-        st.markdown("""
+        st.markdown(f"""
         ### 🎯 Your Mission:
         - **Investigate** high costs using Kubecost
         - **Optimize** resources efficiently
@@ -375,32 +264,31 @@ def show_intro():
         - **Save** at least 40% to succeed!
         
         ### 🏆 Scoring:
-        - Max points: 500
+        - Max points: {get_graph().scores.best}
         - Success threshold: 300+
         - Earn badges for achievements
         """)
     
     if st.button("🔍 Begin Investigation", key="start", help="Start your FinOps detective journey"):
-        st.session_state.current_stage = "stage1"
+        st.session_state.current_stage = get_graph().start
         st.session_state.feedback = None
         st.rerun()
 
 def show_game_stage():
     """Display current game stage"""
-    scenarios = get_scenarios()
-    current = scenarios.get(st.session_state.current_stage)
-    
-    if not current:
+    graph = get_graph()
+    if st.session_state.current_stage not in graph:
         return
+    current = get_stage(st.session_state.current_stage)
     
-    # Progress bar
-    stage_num = int(st.session_state.current_stage[-1]) if st.session_state.current_stage.startswith("stage") else 0
-    progress = stage_num / 5
+    # Progress bar: stages played so far plus the shortest way to the end from here
+    stage_num = len(st.session_state.choices_made) + 1
+    total_stages = stage_num + graph.node(st.session_state.current_stage).remaining
     
     col1, col2, col3 = st.columns([2, 2, 1])
     with col1:
-        st.progress(progress)
-        st.caption(f"Stage {stage_num}/5")
+        st.progress(stage_num / total_stages)
+        st.caption(f"Stage {stage_num}/{total_stages}")
     with col2:
         st.metric("Points", st.session_state.points, delta=None)
     with col3:
@@ -418,16 +306,19 @@ def show_game_stage():
     
     # Stage description
     st.markdown("---")
-    description = current["description"]
-    for key, value in st.session_state.stage_data.items():
-        description = description.replace(f"${{{key}}}", str(value))
+    description = fill_template(current["description"], st.session_state.stage_data)
     st.markdown(f"### {description}")
     
     # Kubecost data display
-    if current.get("data"):
+    if current.get("data") or current.get("report"):
         st.markdown("#### 📊 Kubecost Report:")
-        df = format_data_with_values(current["data"], st.session_state.stage_data)
+        df = stage_report(st.session_state.current_stage, st.session_state.cluster_seed,
+                          tuple(st.session_state.stage_data.items()))
         st.dataframe(df, use_container_width=True, hide_index=True)
+        if current.get("report"):
+            cluster = get_cluster(st.session_state.cluster_seed)
+            st.caption(f"Cluster: {len(cluster.workloads):,} workloads, {len(cluster.pods):,} pods, "
+                       f"last {cluster.cpu_usage.shape[1]} hours")
     
     # Choices
     st.markdown("#### What's your next move?")
@@ -442,10 +333,11 @@ def show_end_screen():
     """Display end game screen"""
     st.session_state.badges = calculate_badges()
     
-    # Calculate savings
+    # Calculate savings, relative to the best score any path through the scenarios can reach
+    scores = get_graph().scores
     initial_cost = st.session_state.stage_data.get("cost", 5000)
-    savings_percent = min((st.session_state.points / 500) * 50, 45)
-    final_cost = int(initial_cost * (1 - savings_percent / 100))
+    savings_percent = min(max(st.session_state.points, 0) / scores.best * 50, 45)
+    final_cost = money.scale(money.to_cents(initial_cost), 1 - savings_percent / 100) // money.CENTS_PER_DOLLAR
     
     # Success or failure
     success = st.session_state.points >= 300
@@ -472,9 +364,11 @@ def show_end_screen():
     with col1:
         st.markdown("### 📊 Final Report")
         metrics_data = {
-            "Metric": ["Total Points", "Initial Monthly Cost", "Final Monthly Cost", "Cost Reduction", "Annual Savings"],
+            "Metric": ["Total Points", "Paths Matched or Beaten", "Initial Monthly Cost", "Final Monthly Cost",
+                       "Cost Reduction", "Annual Savings"],
             "Value": [
-                f"{st.session_state.points}/500",
+                f"{st.session_state.points}/{scores.best}",
+                f"{get_graph().percentile(st.session_state.points):.1f}% of {scores.paths:,}",
                 f"${initial_cost}",
                 f"${final_cost}",
                 f"{savings_percent:.1f}%",
@@ -491,6 +385,14 @@ def show_end_screen():
         else:
             st.markdown("No badges earned. Try again!")
     
+    # Best path, precomputed with the scenario graph
+    st.markdown("---")
+    st.markdown(f"### 🧭 Best Path ({scores.best} points)")
+    for stage, choice_index in scores.best_path:
+        choice = get_stage(stage)["choices"][choice_index]
+        mark = "✅" if choice["text"] in st.session_state.choices_made else "▫️"
+        st.markdown(f"{mark} {choice['text']} ({choice['points']:+d})")
+    
     # Key learnings
     st.markdown("---")
     st.markdown("### 📚 Key FinOps Learnings")
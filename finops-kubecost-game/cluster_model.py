@@ -0,0 +1,358 @@
+"""Synthetic Kubernetes cluster behind the Kubecost reports.
+
+``build_cluster`` generates namespaces, workloads and their pods. Each
+workload gets a week of hourly CPU and memory usage per pod, stored as
+``workloads x hours`` float32 arrays with a daily cycle and noise. Each
+namespace has its own typical utilization, and the workloads the
+investigation is about are pinned so the story holds for every seed.
+Costs follow Kubecost's allocation model: each hour, the larger of the
+request and the usage is billed at a per-vCPU and per-GiB price. Costs and
+efficiencies are vectorized NumPy reductions and pandas groupbys.
+Rightsizing recommendations come from the ``rightsizing`` engine.
+A 100k-pod cluster builds in well under a second. The ``*_report``
+functions render the stage tables from a cluster.
+
+Usage:
+    python cluster_model.py --workloads 30000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import money
+import rightsizing
+from rightsizing import CPU_HOUR_PRICE, HOURS_PER_MONTH, RAM_HOUR_PRICE
+
+SERIES_HOURS = 7 * 24  # One week of hourly usage
+DEFAULT_WORKLOADS = 600
+
+# Share of background workloads and mean utilization of requests per namespace
+NAMESPACES = {
+    "prod": {"share": 0.5, "cpu_util": 0.40, "mem_util": 0.35},
+    "dev": {"share": 0.3, "cpu_util": 0.70, "mem_util": 0.65},
+    "staging": {"share": 0.2, "cpu_util": 0.55, "mem_util": 0.50},
+}
+# Share of background workloads and chance of carrying a team label per kind
+KINDS = {
+    "Deployment": {"share": 0.7, "tagged": 0.20},
+    "StatefulSet": {"share": 0.15, "tagged": 0.15},
+    "CronJob": {"share": 0.15, "tagged": 0.05},
+}
+TEAMS = ["payments", "search", "platform", "data", "growth"]
+NAME_PREFIXES = ["web", "worker", "cache", "gateway", "etl", "auth", "queue", "report", "sync", "ml"]
+CPU_REQUESTS = [0.1, 0.25, 0.5, 1.0, 2.0, 4.0]  # vCPU per pod
+CPU_REQUEST_WEIGHTS = [0.15, 0.25, 0.3, 0.18, 0.09, 0.03]
+GIB_PER_VCPU = [1.0, 2.0, 4.0]
+
+# Workloads the investigation is about (per-pod requests, mean utilization)
+STORY_WORKLOADS = [
+    {"namespace": "prod", "name": "api-server", "kind": "Deployment", "replicas": 10,
+     "cpu_request": 4.0, "mem_request": 8.0, "cpu_util": 0.2, "mem_util": 0.25},
+    {"namespace": "prod", "name": "data-processor", "kind": "StatefulSet", "replicas": 6,
+     "cpu_request": 8.0, "mem_request": 16.0, "cpu_util": 0.94, "mem_util": 0.94},
+    {"namespace": "prod", "name": "legacy-app", "kind": "Deployment", "replicas": 5,
+     "cpu_request": 2.0, "mem_request": 4.0, "cpu_util": 0.05, "mem_util": 0.125},
+]
+
+SPOT_DISCOUNT = 0.65  # Spot vs On-Demand for dev/staging Deployments
+RESERVED_DISCOUNT = 0.30  # 1-year reservation on prod's always-on baseline
+WORK_HOURS_PER_WEEK = 5 * 12  # Dev keeps running only on weekday working hours
+GIB = 2**30
+
+# Allocation name per workload for each supported Kubecost ``aggregate``
+ALLOCATION_KEYS = {
+    "namespace": lambda w: w["namespace"].astype(str),
+    "controllerKind": lambda w: w["kind"].astype(str).str.lower(),
+    "controller": lambda w: w["kind"].astype(str).str.lower() + ":" + w["name"],
+}
+
+
+class Cluster:
+    """Workloads and pods of a synthetic cluster with per-pod hourly usage"""
+
+    def __init__(self, workloads, pods, cpu_usage, mem_usage, hourly_cost):
+        self.workloads = workloads  # One row per workload, with requests, usage and cost columns
+        self.pods = pods  # One row per pod: workload index and load skew
+        self.cpu_usage = cpu_usage  # vCPU per pod, workloads x hours
+        self.mem_usage = mem_usage  # GiB per pod, workloads x hours
+        self.hourly_cost = hourly_cost  # $ per workload, workloads x hours
+
+
+def new_seed():
+    """Pick a seed for a new cluster"""
+    return int(np.random.SeedSequence().generate_state(1, np.uint64)[0] >> 1)
+
+
+def _usage(rng, request, util, amplitude, hours):
+    """Hourly per-pod usage with a daily cycle and multiplicative noise"""
+    n = len(request)
+    hour = np.arange(hours, dtype=np.float32)
+    peak = rng.integers(0, 24, n).astype(np.float32)
+    daily = 1 + amplitude[:, None] * np.cos(2 * np.pi * (hour - peak[:, None]) / 24)
+    noise = rng.standard_normal((n, hours), dtype=np.float32)
+    return (request * util).astype(np.float32)[:, None] * daily * np.maximum(1 + 0.15 * noise, 0.0)
+
+
+def build_cluster(seed=None, workloads=DEFAULT_WORKLOADS, hours=SERIES_HOURS):
+    """Generate a cluster of ``workloads`` background workloads plus the story workloads"""
+    rng = np.random.default_rng(seed)
+    n = workloads
+    ns_names, kind_names = list(NAMESPACES), list(KINDS)
+    ns = rng.choice(len(ns_names), n, p=[v["share"] for v in NAMESPACES.values()])
+    kind = rng.choice(len(kind_names), n, p=[v["share"] for v in KINDS.values()])
+    cpu_request = rng.choice(CPU_REQUESTS, n, p=CPU_REQUEST_WEIGHTS)
+    target = np.array([[v["cpu_util"], v["mem_util"]] for v in NAMESPACES.values()])[ns]
+    tagged = rng.random(n) < np.array([v["tagged"] for v in KINDS.values()])[kind]
+    background = pd.DataFrame({
+        "namespace": np.array(ns_names)[ns],
+        "name": pd.Series(np.array(NAME_PREFIXES)[rng.integers(0, len(NAME_PREFIXES), n)])
+                + "-" + pd.Series(np.arange(n)).map("{:04x}".format),
+        "kind": np.array(kind_names)[kind],
+        "replicas": 1 + rng.poisson(2, n),
+        "cpu_request": cpu_request,
+        "mem_request": cpu_request * rng.choice(GIB_PER_VCPU, n),
+        "cpu_util": np.clip(rng.normal(target[:, 0], 0.15), 0.02, 1.1),
+        "mem_util": np.clip(rng.normal(target[:, 1], 0.15), 0.02, 1.1),
+        "team": np.where(tagged, np.array(TEAMS)[rng.integers(0, len(TEAMS), n)], ""),
+    })
+    story = pd.DataFrame(STORY_WORKLOADS).assign(team="")
+    frame = pd.concat([story, background], ignore_index=True)
+    frame["namespace"] = pd.Categorical(frame["namespace"], categories=ns_names)
+    frame["kind"] = pd.Categorical(frame["kind"], categories=kind_names)
+
+    cpu_request = frame["cpu_request"].to_numpy()
+    mem_request = frame["mem_request"].to_numpy()
+    amplitude = rng.uniform(0.1, 0.5, len(frame)).astype(np.float32)
+    cpu_usage = _usage(rng, cpu_request, frame["cpu_util"].to_numpy(), amplitude, hours)
+    mem_usage = _usage(rng, mem_request, frame["mem_util"].to_numpy(), amplitude / 3, hours)
+
+    # Kubecost allocation: the larger of request and usage, each hour
+    replicas = frame["replicas"].to_numpy()
+    hourly_cost = replicas[:, None] * (
+        np.maximum(cpu_usage, cpu_request[:, None].astype(np.float32)) * CPU_HOUR_PRICE
+        + np.maximum(mem_usage, mem_request[:, None].astype(np.float32)) * RAM_HOUR_PRICE
+    )
+    frame["cpu_usage"] = cpu_usage.mean(axis=1, dtype=np.float64)
+    frame["mem_usage"] = mem_usage.mean(axis=1, dtype=np.float64)
+    frame["monthly_cost"] = hourly_cost.mean(axis=1, dtype=np.float64) * HOURS_PER_MONTH
+
+    # Pods share their workload's usage unevenly; skews average 1 per workload
+    workload = np.repeat(np.arange(len(frame)), replicas)
+    skew = rng.lognormal(0.0, 0.1, len(workload))
+    skew /= (np.bincount(workload, weights=skew) / replicas)[workload]
+    pods = pd.DataFrame({"workload": workload, "skew": skew})
+    return Cluster(frame, pods, cpu_usage, mem_usage, hourly_cost)
+
+
+def _dollars(amount):
+    """Whole dollars of a dollar amount (or array), rounded once via cents"""
+    return money.to_cents(amount) // money.CENTS_PER_DOLLAR
+
+
+def namespace_costs(cluster):
+    """Monthly cost and CPU/memory efficiency (usage over requests) per namespace"""
+    w = cluster.workloads
+    totals = w.assign(
+        cpu_used=w["cpu_usage"] * w["replicas"], cpu_requested=w["cpu_request"] * w["replicas"],
+        mem_used=w["mem_usage"] * w["replicas"], mem_requested=w["mem_request"] * w["replicas"],
+    ).groupby("namespace", observed=False)[
+        ["monthly_cost", "cpu_used", "cpu_requested", "mem_used", "mem_requested"]
+    ].sum()
+    return pd.DataFrame({
+        "monthly_cost": totals["monthly_cost"],
+        "cpu_efficiency": totals["cpu_used"] / totals["cpu_requested"],
+        "mem_efficiency": totals["mem_used"] / totals["mem_requested"],
+    })
+
+
+def workload_rightsizing(cluster, headroom=rightsizing.HEADROOM, count=None):
+    """Usage percentiles and request recommendations of the first ``count`` workloads (default: all).
+
+    Requests are sized for each workload's hottest pod and never raised, so savings are never negative.
+    """
+    w = cluster.workloads.iloc[:count]
+    hottest = cluster.pods.groupby("workload")["skew"].max().to_numpy(np.float32)[:len(w), None]
+    # A week of hourly samples is smaller than a sketch, so take exact percentiles
+    cpu = rightsizing.SampleQuantiles(cluster.cpu_usage[:len(w)] * hottest)
+    mem = rightsizing.SampleQuantiles(cluster.mem_usage[:len(w)] * hottest)
+    result = rightsizing.recommend(cpu, mem, w[["namespace", "name", "replicas", "cpu_request", "mem_request"]],
+                                   headroom)
+    result["cpu_recommended"] = np.minimum(result["cpu_recommended"], result["cpu_request"])
+    result["mem_recommended"] = np.minimum(result["mem_recommended"], result["mem_request"])
+    result["monthly_savings"] = result["replicas"] * HOURS_PER_MONTH * (
+        (result["cpu_request"] - result["cpu_recommended"]) * CPU_HOUR_PRICE
+        + (result["mem_request"] - result["mem_recommended"]) * RAM_HOUR_PRICE
+    )
+    return result
+
+
+def rightsizing_candidates(cluster, headroom=rightsizing.HEADROOM):
+    """Workloads that can shrink their requests, by monthly savings"""
+    result = workload_rightsizing(cluster, headroom)
+    return result[result["monthly_savings"] > 0].sort_values("monthly_savings", ascending=False)
+
+
+def allocations(cluster, aggregate="namespace", hours=SERIES_HOURS):
+    """Kubecost-style allocation totals over the last ``hours``, one row per namespace, controller or kind.
+
+    Columns use the Kubecost allocation API's field names (rates per hour, costs for the window).
+    """
+    if aggregate not in ALLOCATION_KEYS:
+        raise ValueError(f"Unsupported aggregate {aggregate!r} (use {', '.join(ALLOCATION_KEYS)})")
+    w = cluster.workloads
+    replicas = w["replicas"].to_numpy()
+    cpu_used = cluster.cpu_usage[:, -hours:]
+    mem_used = cluster.mem_usage[:, -hours:]
+    cpu_request = w["cpu_request"].to_numpy()
+    mem_request = w["mem_request"].to_numpy()
+    cpu_billed = np.maximum(cpu_used, cpu_request[:, None].astype(np.float32)).mean(axis=1, dtype=np.float64)
+    mem_billed = np.maximum(mem_used, mem_request[:, None].astype(np.float32)).mean(axis=1, dtype=np.float64)
+    frame = pd.DataFrame({
+        "name": ALLOCATION_KEYS[aggregate](w),
+        "cpuCores": cpu_billed * replicas,
+        "cpuCoreRequestAverage": cpu_request * replicas,
+        "cpuCoreUsageAverage": cpu_used.mean(axis=1, dtype=np.float64) * replicas,
+        "ramBytes": mem_billed * replicas * GIB,
+        "ramByteRequestAverage": mem_request * replicas * GIB,
+        "ramByteUsageAverage": mem_used.mean(axis=1, dtype=np.float64) * replicas * GIB,
+    })
+    totals = frame.groupby("name", sort=False).sum()
+    totals["cpuCoreHours"] = totals["cpuCores"] * hours
+    totals["ramByteHours"] = totals["ramBytes"] * hours
+    totals["cpuCost"] = totals["cpuCoreHours"] * CPU_HOUR_PRICE
+    totals["ramCost"] = totals["ramByteHours"] / GIB * RAM_HOUR_PRICE
+    totals["totalCost"] = totals["cpuCost"] + totals["ramCost"]
+    totals["cpuEfficiency"] = totals["cpuCoreUsageAverage"] / totals["cpuCoreRequestAverage"]
+    totals["ramEfficiency"] = totals["ramByteUsageAverage"] / totals["ramByteRequestAverage"]
+    totals["minutes"] = hours * 60
+    return totals
+
+
+def stage_values(costs):
+    """Whole-dollar values for the ``${name}`` placeholders in scenario text, from ``namespace_costs``"""
+    costs = costs["monthly_cost"]
+    return {
+        "cost": int(_dollars(costs.sum())),
+        "prod_cost": int(_dollars(costs["prod"])),
+        "dev_cost": int(_dollars(costs["dev"])),
+        "stage_cost": int(_dollars(costs["staging"])),
+    }
+
+
+def _percent(ratio):
+    return ratio.map(lambda r: f"{r:.0%}")
+
+
+def _millicores(vcpu):
+    return f"{vcpu * 1000:.0f}m"
+
+
+def _money(dollars):
+    return pd.Series(_dollars(np.asarray(dollars)), index=getattr(dollars, "index", None)).map("${:,}".format)
+
+
+def namespace_report(cluster):
+    """Cost and efficiency per namespace (stage 1)"""
+    return namespace_table(namespace_costs(cluster))
+
+
+def namespace_table(costs):
+    """Stage 1 table from ``namespace_costs`` (computed locally or read from a Kubecost API)"""
+    return pd.DataFrame({
+        "Namespace": costs.index.astype(str),
+        "Monthly Cost": _money(costs["monthly_cost"]).to_numpy(),
+        "CPU Efficiency": _percent(costs["cpu_efficiency"]).to_numpy(),
+        "Memory Efficiency": _percent(costs["mem_efficiency"]).to_numpy(),
+    })
+
+
+def workload_report(cluster):
+    """Per-pod requests, average usage and rightsizing of the story workloads (stage 2)"""
+    story = len(STORY_WORKLOADS)
+    w = cluster.workloads.iloc[:story]
+    recommended = workload_rightsizing(cluster, count=story)
+    return pd.DataFrame({
+        "Workload": w["name"].to_numpy(),
+        "Monthly Cost": _money(w["monthly_cost"]).to_numpy(),
+        "CPU Request": w["cpu_request"].map(_millicores).to_numpy(),
+        "CPU Usage": w["cpu_usage"].map(_millicores).to_numpy(),
+        "Recommended CPU": recommended["cpu_recommended"].map(_millicores).to_numpy(),
+        "Memory Request": w["mem_request"].map(lambda v: f"{v:g}Gi").to_numpy(),
+        "Memory Usage": w["mem_usage"].map(lambda v: f"{v:.1f}Gi").to_numpy(),
+        "Recommended Memory": recommended["mem_recommended"].map(lambda v: f"{v:.1f}Gi").to_numpy(),
+        "Rightsizing Savings": _money(recommended["monthly_savings"]).map("{}/mo".format).to_numpy(),
+    })
+
+
+def kind_report(cluster):
+    """Count, cost and label coverage per workload kind (stage 3)"""
+    w = cluster.workloads.assign(tagged=cluster.workloads["team"] != "")
+    w["untagged_cost"] = w["monthly_cost"].where(~w["tagged"], 0.0)
+    kinds = w.groupby("kind", observed=False).agg(
+        count=("name", "size"), cost=("monthly_cost", "sum"), tagged=("tagged", "mean"),
+        untagged_cost=("untagged_cost", "sum"),
+    )
+    return pd.DataFrame({
+        "Resource Type": [f"{kind}s" for kind in kinds.index],
+        "Count": kinds["count"].to_numpy(),
+        "Monthly Cost": _money(kinds["cost"]).to_numpy(),
+        "Tagged %": _percent(kinds["tagged"]).to_numpy(),
+        "Unallocated Cost": _money(kinds["untagged_cost"]).to_numpy(),
+    })
+
+
+def optimization_report(cluster):
+    """Potential monthly savings of Kubecost's recommendation types (stage 4)"""
+    w = cluster.workloads
+    non_prod = w["namespace"].isin(["dev", "staging"]).to_numpy()
+    stateless = (w["kind"] == "Deployment").to_numpy()
+    prod = (w["namespace"] == "prod").to_numpy()
+    dev = (w["namespace"] == "dev").to_numpy()
+    monthly = w["monthly_cost"].to_numpy()
+    savings = [
+        monthly[non_prod & stateless].sum() * SPOT_DISCOUNT,
+        cluster.hourly_cost[prod].sum(axis=0).min() * HOURS_PER_MONTH * RESERVED_DISCOUNT,
+        rightsizing_candidates(cluster)["monthly_savings"].sum(),
+        monthly[dev].sum() * (1 - WORK_HOURS_PER_WEEK / SERIES_HOURS),
+    ]
+    return pd.DataFrame({
+        "Optimization Type": ["Spot Instances (dev)", "Reserved Instances", "Autoscaling (HPA/VPA)", "Off-hours Scaling"],
+        "Potential Savings": [f"${d:,}/mo" for d in _dollars(np.array(savings)).tolist()],
+        "Implementation Effort": ["Medium", "Low", "High", "Medium"],
+        "Risk Level": ["Low", "Very Low", "Medium", "Low"],
+    })
+
+
+# Report names usable as a stage's "report" in scenarios/*.json
+REPORTS = {
+    "namespaces": namespace_report,
+    "workloads": workload_report,
+    "kinds": kind_report,
+    "optimizations": optimization_report,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a synthetic cluster and time its Kubecost reports")
+    parser.add_argument("--workloads", type=int, default=DEFAULT_WORKLOADS, help="Background workloads")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cluster = build_cluster(args.seed, args.workloads)
+    built = time.perf_counter()
+    for report in REPORTS.values():
+        report(cluster)
+    candidates = rightsizing_candidates(cluster)
+    done = time.perf_counter()
+    print(f"{len(cluster.workloads):,} workloads, {len(cluster.pods):,} pods, {cluster.cpu_usage.shape[1]} hours: "
+          f"built in {(built - start) * 1000:.0f} ms, reports in {(done - built) * 1000:.0f} ms")
+    print(namespace_report(cluster).to_string(index=False))
+    print(f"{len(candidates):,} rightsizing candidates, "
+          f"{money.format_cents(money.to_cents(candidates['monthly_savings'].sum()))}/mo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Async Kubecost API client shared by every player.
+
+One ``httpx.AsyncClient`` keeps a pool of keep-alive connections to the API.
+Responses are cached for ``ttl`` seconds. Concurrent requests for the same
+query are coalesced: the first caller starts the fetch and the others await
+the same task. So any number of players opening the same scenario cost one
+upstream request per TTL. Streamlit scripts are synchronous and run on one
+thread per session, so ``get`` runs coroutines on the client's own event
+loop in a background thread. Async code (like the load test) can await
+``fetch`` and ``allocation`` directly instead; a client should be used from
+one of the two, not both.
+"""
+import asyncio
+import threading
+import time
+
+import httpx
+import pandas as pd
+
+from rightsizing import HOURS_PER_MONTH
+
+DEFAULT_TTL = 60.0  # Seconds a response is served from the cache
+MAX_CONNECTIONS = 20
+TIMEOUT = 10.0
+MAX_CACHED = 256  # Expired entries are purged once the cache grows past this
+# Allocation fields namespace_costs reads
+ALLOCATION_FIELDS = ("totalCost", "minutes", "cpuCoreUsageAverage", "cpuCoreRequestAverage",
+                     "ramByteUsageAverage", "ramByteRequestAverage")
+
+
+class KubecostError(RuntimeError):
+    """The Kubecost API answered with an error"""
+
+
+class KubecostClient:
+    """Pooled, coalescing, TTL-cached client for the Kubecost API"""
+
+    def __init__(self, base_url, ttl=DEFAULT_TTL, max_connections=MAX_CONNECTIONS, timeout=TIMEOUT):
+        self.base_url = base_url
+        self.ttl = ttl
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._timeout = timeout
+        self._http = None
+        self._cache = {}  # query -> (expires, data)
+        self._inflight = {}  # query -> task fetching it
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "fetches": 0, "errors": 0}
+
+    async def fetch(self, path, **params):
+        """GET ``path`` through the cache, joining an identical fetch already in flight"""
+        key = (path, tuple(sorted(params.items())))
+        self.stats["requests"] += 1
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            self.stats["cache_hits"] += 1
+            return cached[1]
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._fetch(key, path, params))
+        else:
+            self.stats["coalesced"] += 1
+        # A waiter that gives up must not cancel the fetch the others are waiting on
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key, path, params):
+        self.stats["fetches"] += 1
+        try:
+            if self._http is None:
+                self._http = httpx.AsyncClient(base_url=self.base_url, limits=self._limits, timeout=self._timeout)
+            response = await self._http.get(path, params=params)
+            response.raise_for_status()
+            body = response.json()
+            if not isinstance(body, dict):
+                raise KubecostError(f"GET {path}: expected a JSON object, got {type(body).__name__}")
+            if body.get("code", 200) != 200:
+                raise KubecostError(body.get("message") or f"Kubecost returned code {body.get('code')}")
+            if not isinstance(body.get("data"), list):
+                raise KubecostError(f"GET {path}: response has no data list")
+        except (httpx.HTTPError, ValueError) as e:
+            self.stats["errors"] += 1
+            raise KubecostError(f"GET {path} failed: {e}") from e
+        finally:
+            self._inflight.pop(key, None)
+        if len(self._cache) >= MAX_CACHED:
+            now = time.monotonic()
+            self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+        self._cache[key] = (time.monotonic() + self.ttl, body["data"])
+        return body["data"]
+
+    async def allocation(self, window="7d", aggregate="namespace", **params):
+        """Accumulated allocation set (name -> allocation) for ``window``"""
+        data = await self.fetch("/model/allocation", window=window, aggregate=aggregate, accumulate="true", **params)
+        allocation_set = data[0] if data else {}
+        if not isinstance(allocation_set, dict) or not all(isinstance(a, dict) for a in allocation_set.values()):
+            raise KubecostError("Malformed allocation set in the Kubecost response")
+        return allocation_set
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def get(self, coro, timeout=None):
+        """Run a coroutine of this client on its background event loop and wait for the result"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="kubecost-client", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout or 2 * self._timeout)
+
+
+def namespace_costs(allocation_set, namespaces=None):
+    """Monthly cost and CPU/memory efficiency per namespace from an allocation set (like ``cluster_model.namespace_costs``).
+
+    Raises ``KubecostError`` when the set is empty, lacks a field, or lacks one of ``namespaces``.
+    """
+    rows = {name: a for name, a in allocation_set.items() if not name.startswith("__")}  # Skip __idle__ etc.
+    if not rows:
+        raise KubecostError("The allocation set has no namespaces")
+    frame = pd.DataFrame.from_dict(rows, orient="index")
+    missing = [field for field in ALLOCATION_FIELDS if field not in frame]
+    if missing:
+        raise KubecostError(f"Allocations are missing {', '.join(missing)}")
+    try:
+        frame = frame[list(ALLOCATION_FIELDS)].astype(float)
+    except (TypeError, ValueError) as e:
+        raise KubecostError(f"Non-numeric allocation field: {e}") from e
+    costs = pd.DataFrame({
+        "monthly_cost": frame["totalCost"] / (frame["minutes"] / 60) * HOURS_PER_MONTH,
+        "cpu_efficiency": frame["cpuCoreUsageAverage"] / frame["cpuCoreRequestAverage"],
+        "mem_efficiency": frame["ramByteUsageAverage"] / frame["ramByteRequestAverage"],
+    })
+    costs.index.name = "namespace"
+    if namespaces is not None:
+        absent = [n for n in namespaces if n not in costs.index]
+        if absent:
+            raise KubecostError(f"The allocation set has no {', '.join(absent)} namespace")
+        costs = costs.reindex(namespaces)
+    return costs
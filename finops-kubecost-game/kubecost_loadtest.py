@@ -0,0 +1,88 @@
+"""Fan-in load test for the Kubecost client.
+
+Simulates many concurrent players opening the same scenarios. Each player
+asks for the namespace allocation of its scenario a few times, with some
+think time in between. The test runs twice: once sending every request
+straight to the API, and once through a shared ``KubecostClient``. For each
+run it reports player requests, queries the server actually served (from
+``/stats``), the fan-in ratio and p50/p95/p99 latency.
+
+Usage:
+    uvicorn mock_kubecost:app --port 9090 &
+    python kubecost_loadtest.py --url http://localhost:9090 --players 200 --scenarios 3
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+import numpy as np
+
+from kubecost_client import MAX_CONNECTIONS, KubecostClient
+
+
+async def _player(fetch, scenario, rounds, think, latencies):
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await fetch(scenario)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(random.uniform(0, think))
+
+
+async def _served(url):
+    async with httpx.AsyncClient(base_url=url) as http:
+        return (await http.get("/stats")).json()["allocation"]
+
+
+async def run(url, players, scenarios, rounds, think, shared):
+    """Play ``players`` concurrent sessions; return latencies and the number of upstream queries"""
+    latencies = []
+    before = await _served(url)
+    if shared:
+        client = KubecostClient(url)
+
+        async def fetch(scenario):
+            return await client.allocation(window="7d", aggregate="namespace", cluster=scenario)
+    else:
+        limits = httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS)
+        client = httpx.AsyncClient(base_url=url, limits=limits, timeout=60)
+
+        async def fetch(scenario):
+            params = {"window": "7d", "aggregate": "namespace", "accumulate": "true", "cluster": scenario}
+            response = await client.get("/model/allocation", params=params)
+            response.raise_for_status()
+            return response.json()["data"][0]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _player(fetch, player % scenarios, rounds, think, latencies) for player in range(players)
+    ))
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return latencies, await _served(url) - before, elapsed
+
+
+def report(name, latencies, upstream, elapsed):
+    p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+    print(f"{name:<16}{len(latencies):>9,}{upstream:>10,}{len(latencies) / max(upstream, 1):>9.1f}x"
+          f"{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}{elapsed:>8.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show request fan-in through the shared Kubecost client")
+    parser.add_argument("--url", default="http://localhost:9090", help="Base URL of the (mock) Kubecost API")
+    parser.add_argument("--players", type=int, default=200, help="Concurrent simulated players")
+    parser.add_argument("--scenarios", type=int, default=3, help="Distinct clusters the players spread over")
+    parser.add_argument("--rounds", type=int, default=5, help="Allocation requests per player")
+    parser.add_argument("--think", type=float, default=0.5, help="Max seconds between a player's requests")
+    args = parser.parse_args()
+
+    print(f"{'mode':<16}{'requests':>9}{'upstream':>10}{'fan-in':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'time':>9}")
+    for name, shared in (("direct", False), ("shared client", True)):
+        report(name, *asyncio.run(run(args.url, args.players, args.scenarios, args.rounds, args.think, shared)))
+
+
+if __name__ == "__main__":
+    main()
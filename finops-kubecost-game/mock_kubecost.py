@@ -0,0 +1,71 @@
+"""Local stand-in for the Kubecost allocation API.
+
+Serves ``/model/allocation`` in the Kubecost API's JSON shape, computed from
+``cluster_model`` clusters. The mock-only ``cluster`` parameter picks the
+cluster's seed. Clusters and responses are memoized, so the server itself is
+cheap. ``MOCK_KUBECOST_DELAY_MS`` adds a fixed delay per query to stand in
+for a real Kubecost's query time. ``/stats`` reports how many allocation
+queries were served, which load tests use to measure fan-in.
+
+Run with:
+    uvicorn mock_kubecost:app --port 9090
+"""
+import asyncio
+import os
+import re
+from functools import lru_cache
+
+from fastapi import FastAPI, HTTPException
+
+import cluster_model
+
+DEFAULT_CLUSTER = 0
+DELAY_SECONDS = float(os.environ.get("MOCK_KUBECOST_DELAY_MS", "200")) / 1000
+WINDOW = re.compile(r"^(\d+)([hd])$")
+
+app = FastAPI(title="Mock Kubecost API")
+_served = {"allocation": 0}
+
+
+@lru_cache(maxsize=32)
+def _cluster(seed):
+    return cluster_model.build_cluster(seed)
+
+
+@lru_cache(maxsize=256)
+def _allocation_set(seed, aggregate, hours):
+    totals = cluster_model.allocations(_cluster(seed), aggregate, hours)
+    properties = {"namespace": "namespace", "controllerKind": "controllerKind", "controller": "controller"}[aggregate]
+    return {
+        name: {"name": name, "properties": {"cluster": f"cluster-{seed}", properties: name}, **row}
+        for name, row in totals.to_dict(orient="index").items()
+    }
+
+
+def _window_hours(window):
+    match = WINDOW.match(window)
+    if not match:
+        raise HTTPException(status_code=400, detail=f"Unsupported window {window!r} (use e.g. 24h or 7d)")
+    hours = int(match.group(1)) * (24 if match.group(2) == "d" else 1)
+    return max(1, min(hours, cluster_model.SERIES_HOURS))
+
+
+@app.get("/model/allocation")
+async def allocation(window: str = "7d", aggregate: str = "namespace", accumulate: bool = True,
+                     cluster: int = DEFAULT_CLUSTER):
+    """Allocation totals for the window, aggregated by namespace, controller or controllerKind"""
+    # Always one accumulated set; per-step sets (accumulate=false) are not modelled
+    _served["allocation"] += 1
+    if aggregate not in cluster_model.ALLOCATION_KEYS:
+        raise HTTPException(status_code=400, detail=f"Unsupported aggregate {aggregate!r}")
+    hours = _window_hours(window)
+    if DELAY_SECONDS:
+        await asyncio.sleep(DELAY_SECONDS)
+    allocation_set = await asyncio.to_thread(_allocation_set, cluster, aggregate, hours)
+    return {"code": 200, "status": "success", "data": [allocation_set]}
+
+
+@app.get("/stats")
+async def stats():
+    """Queries served since the server started"""
+    return dict(_served)
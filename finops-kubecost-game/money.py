@@ -0,0 +1,55 @@
+"""Integer-cents money arithmetic.
+
+Amounts are stored as int64 cents, either as Python ints or NumPy arrays, so
+sums over millions of line items are exact and vectorized. Rounding happens
+once, when dollars are converted or a rate is applied, never when summing.
+Every function accepts a scalar or an array and returns the same shape.
+"""
+import numpy as np
+
+CENTS_PER_DOLLAR = 100
+
+
+def _out(value):
+    """Return NumPy 0-d results as plain Python scalars"""
+    return value.item() if isinstance(value, (np.ndarray, np.generic)) and np.ndim(value) == 0 else value
+
+
+def to_cents(dollars):
+    """Convert dollar amounts to int64 cents (round half to even)"""
+    return _out(np.rint(np.asarray(dollars, dtype=np.float64) * CENTS_PER_DOLLAR).astype(np.int64))
+
+
+def to_dollars(cents):
+    """Convert cents back to float dollars for display or JSON"""
+    return _out(np.asarray(cents, dtype=np.int64) / CENTS_PER_DOLLAR)
+
+
+def total(cents):
+    """Exact sum of cent amounts"""
+    return int(np.sum(cents, dtype=np.int64))
+
+
+def scale(cents, factor):
+    """Multiply cent amounts by a factor (rate, multiplier) and round to whole cents"""
+    return _out(np.rint(np.asarray(cents, dtype=np.int64) * np.asarray(factor, dtype=np.float64)).astype(np.int64))
+
+
+def percent(part, whole):
+    """``part`` as a percentage of ``whole`` (0 when ``whole`` is 0)"""
+    part = np.asarray(part, dtype=np.float64)
+    whole = np.asarray(whole, dtype=np.float64)
+    return _out(np.divide(part * 100, whole, out=np.zeros(np.broadcast(part, whole).shape), where=whole != 0))
+
+
+def _format(cents):
+    sign = "-" if cents < 0 else ""
+    dollars, rest = divmod(abs(cents), CENTS_PER_DOLLAR)
+    return f"{sign}${dollars:,}.{rest:02d}"
+
+
+def format_cents(cents):
+    """Format cent amounts as ``$1,234.56`` (an object array of strings for arrays)"""
+    cents = np.asarray(cents, dtype=np.int64)
+    formatted = np.array([_format(c) for c in cents.ravel().tolist()], dtype=object)
+    return _out(formatted.reshape(cents.shape))
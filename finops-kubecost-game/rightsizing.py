@@ -0,0 +1,223 @@
+"""Percentile-based rightsizing recommendations.
+
+Per-container CPU and memory usage samples are folded into a
+``QuantileSketch``: one log-bucketed histogram per container, DDSketch-style.
+Bucket edges grow by a constant factor, so any percentile read back is
+within ``relative_accuracy`` of the true sample. Memory is
+``containers x buckets`` counters however many samples arrive. Samples are
+added in ``containers x samples`` blocks with one vectorized ``bincount``
+per block. Short series already in memory can use exact ``SampleQuantiles``
+instead. ``recommend`` turns either into P50/P95/P99 usage, request
+recommendations (a high percentile plus headroom) and projected monthly
+savings at the current prices. ``rightsize`` streams containers through in
+chunks, so 100k containers x 30 days of 5-minute samples never needs more
+than one chunk's sketches and one day's samples in memory. Chunks of the
+synthetic fleet run on a process pool.
+
+Usage:
+    python rightsizing.py --containers 100000 --days 30 --out recommendations.csv
+"""
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+CPU_HOUR_PRICE = 0.031611  # $ per vCPU-hour (Kubecost's default on-demand price)
+RAM_HOUR_PRICE = 0.004237  # $ per GiB-hour
+HOURS_PER_MONTH = 730
+
+SAMPLES_PER_DAY = 24 * 60 // 5  # 5-minute samples
+RELATIVE_ACCURACY = 0.02  # Max relative error of a sketched percentile
+CPU_RANGE = (0.001, 128.0)  # vCPU covered by the sketch (1m to 128 cores)
+MEM_RANGE = (1 / 1024, 1024.0)  # GiB covered by the sketch (1 MiB to 1 TiB)
+PERCENTILES = (50, 95, 99)
+CPU_PERCENTILE = 95  # CPU is compressible: size for the busy hours, not the peaks
+MEM_PERCENTILE = 99  # Memory is not: running out means OOM kills
+HEADROOM = 0.2
+MIN_CPU_REQUEST = 0.01
+MIN_MEM_REQUEST = 0.0625
+CHUNK_CONTAINERS = 10_000  # Containers sketched at a time; bounds memory
+
+
+class QuantileSketch:
+    """Log-bucketed usage histogram per container with bounded relative error"""
+
+    def __init__(self, containers, low, high, relative_accuracy=RELATIVE_ACCURACY):
+        self.low = low
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._inv_log_gamma = 1 / math.log(gamma)
+        self.buckets = math.ceil(math.log(high / low) * self._inv_log_gamma) + 1
+        # Bucket 0 holds everything up to ``low``; bucket i the range (low*gamma^(i-1), low*gamma^i]
+        self._values = low * gamma ** np.arange(self.buckets) * 2 / (1 + gamma)
+        self._values[0] = low
+        self.counts = np.zeros((containers, self.buckets), dtype=np.uint32)
+
+    @property
+    def containers(self):
+        return len(self.counts)
+
+    def add(self, samples):
+        """Fold a ``containers x samples`` block of usage into the sketch (NaN/inf samples are skipped)"""
+        samples = np.asarray(samples, dtype=np.float32)
+        finite = np.isfinite(samples)
+        scaled = np.maximum(np.where(finite, samples, np.float32(self.low)), np.float32(self.low))
+        np.log(scaled, out=scaled)
+        scaled -= np.float32(math.log(self.low))
+        scaled *= np.float32(self._inv_log_gamma)
+        np.ceil(scaled, out=scaled)
+        bucket = np.minimum(scaled, self.buckets - 1, out=scaled).astype(np.intp)
+        bucket += (np.arange(self.containers) * self.buckets)[:, None]
+        # Missing scrapes leave no trace: percentiles come from the samples that arrived
+        hits = np.bincount(bucket[finite], minlength=self.counts.size).reshape(self.counts.shape)
+        np.add(self.counts, hits, out=self.counts, casting="unsafe")
+
+    def merge(self, other):
+        """Add another sketch of the same containers (e.g. a different time range)"""
+        self.counts += other.counts
+
+    def quantiles(self, percentiles=PERCENTILES):
+        """``containers x len(percentiles)`` usage at each percentile (NaN without samples)"""
+        cumulative = np.cumsum(self.counts, axis=1, dtype=np.int64)
+        n = cumulative[:, -1]
+        out = np.empty((self.containers, len(percentiles)))
+        for j, p in enumerate(percentiles):
+            rank = np.maximum(np.ceil(n * (p / 100)), 1)
+            out[:, j] = self._values[np.minimum((cumulative < rank[:, None]).sum(axis=1), self.buckets - 1)]
+        out[n == 0] = np.nan
+        return out
+
+
+class SampleQuantiles:
+    """Exact percentiles of a ``containers x samples`` array already in memory.
+
+    For short series (a week of hourly samples, say) this is cheaper than a
+    sketch, which would hold more buckets than there are samples.
+    """
+
+    def __init__(self, samples):
+        self.samples = samples
+
+    def quantiles(self, percentiles=PERCENTILES):
+        return np.percentile(self.samples, percentiles, axis=1, method="inverted_cdf").T
+
+
+def sketch_usage(blocks, containers, relative_accuracy=RELATIVE_ACCURACY):
+    """CPU and memory sketches from an iterable of ``(cpu, mem)`` blocks, each containers x samples"""
+    cpu = QuantileSketch(containers, *CPU_RANGE, relative_accuracy)
+    mem = QuantileSketch(containers, *MEM_RANGE, relative_accuracy)
+    for cpu_block, mem_block in blocks:
+        cpu.add(cpu_block)
+        mem.add(mem_block)
+    return cpu, mem
+
+
+def recommend(cpu, mem, containers, headroom=HEADROOM, cpu_percentile=CPU_PERCENTILE,
+              mem_percentile=MEM_PERCENTILE):
+    """Usage percentiles, request recommendations and monthly savings per container.
+
+    ``cpu`` and ``mem`` are ``QuantileSketch`` or ``SampleQuantiles`` objects.
+    ``containers`` is a DataFrame with ``cpu_request`` (vCPU) and ``mem_request``
+    (GiB) per container, and optionally ``replicas``. Its columns are kept in the
+    result. Savings are negative where a container should get more than it requests.
+    """
+    percentiles = sorted({*PERCENTILES, cpu_percentile, mem_percentile})
+    cpu_q = pd.DataFrame(cpu.quantiles(percentiles), columns=percentiles, index=containers.index)
+    mem_q = pd.DataFrame(mem.quantiles(percentiles), columns=percentiles, index=containers.index)
+    result = containers.copy()
+    for p in PERCENTILES:
+        result[f"cpu_p{p}"] = cpu_q[p]
+    for p in PERCENTILES:
+        result[f"mem_p{p}"] = mem_q[p]
+    result["cpu_recommended"] = np.maximum(cpu_q[cpu_percentile] * (1 + headroom), MIN_CPU_REQUEST)
+    result["mem_recommended"] = np.maximum(mem_q[mem_percentile] * (1 + headroom), MIN_MEM_REQUEST)
+    replicas = containers["replicas"] if "replicas" in containers else 1
+    result["monthly_savings"] = replicas * HOURS_PER_MONTH * (
+        (containers["cpu_request"] - result["cpu_recommended"]) * CPU_HOUR_PRICE
+        + (containers["mem_request"] - result["mem_recommended"]) * RAM_HOUR_PRICE
+    )
+    return result
+
+
+def rightsize(chunks, headroom=HEADROOM, relative_accuracy=RELATIVE_ACCURACY):
+    """Recommendations for containers arriving as ``(containers, blocks)`` chunks, one chunk in memory at a time"""
+    return pd.concat([
+        recommend(*sketch_usage(blocks, len(containers), relative_accuracy), containers, headroom)
+        for containers, blocks in chunks
+    ])
+
+
+def synthetic_containers(size, rng):
+    """Requests and usage profile of ``size`` synthetic containers"""
+    cpu_request = rng.choice([0.1, 0.25, 0.5, 1.0, 2.0, 4.0], size, p=[0.15, 0.25, 0.3, 0.18, 0.09, 0.03])
+    return pd.DataFrame({
+        "cpu_request": cpu_request,
+        "mem_request": cpu_request * rng.choice([1.0, 2.0, 4.0], size),
+        "cpu_util": np.clip(rng.normal(0.45, 0.2, size), 0.02, 1.1),
+        "mem_util": np.clip(rng.normal(0.5, 0.2, size), 0.02, 1.1),
+        "peak": rng.uniform(0, SAMPLES_PER_DAY, size),
+    })
+
+
+def synthetic_blocks(containers, days, rng):
+    """One day of 5-minute CPU and memory samples at a time: a daily cycle with bursty CPU noise"""
+    slot = np.arange(SAMPLES_PER_DAY, dtype=np.float32)
+    phase = 2 * np.pi * (slot - containers["peak"].to_numpy(np.float32)[:, None]) / SAMPLES_PER_DAY
+    daily = 1 + 0.3 * np.cos(phase)
+    cpu_level = (containers["cpu_request"] * containers["cpu_util"]).to_numpy(np.float32)[:, None] * daily
+    mem_level = (containers["mem_request"] * containers["mem_util"]).to_numpy(np.float32)[:, None]
+    shape = (len(containers), SAMPLES_PER_DAY)
+    for _ in range(days):
+        # Exponential and uniform draws are several times cheaper than Gaussian ones at this volume
+        cpu = cpu_level * (0.7 + 0.3 * rng.standard_exponential(shape, dtype=np.float32))
+        mem = mem_level * (0.95 + 0.1 * rng.random(shape, dtype=np.float32))
+        yield cpu, mem
+
+
+def _rightsize_synthetic(size, days, seed_seq, headroom):
+    rng = np.random.default_rng(seed_seq)
+    containers = synthetic_containers(size, rng)
+    return rightsize([(containers, synthetic_blocks(containers, days, rng))], headroom)
+
+
+def rightsize_synthetic(containers, days=30, seed=None, headroom=HEADROOM, chunk=CHUNK_CONTAINERS, workers=None):
+    """Rightsize a synthetic fleet, one chunk of containers per task on a process pool"""
+    sizes = [min(chunk, containers - start) for start in range(0, containers, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = (sizes, [days] * len(sizes), seeds, [headroom] * len(sizes))
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_rightsize_synthetic, *args))
+    else:
+        results = list(map(_rightsize_synthetic, *args))
+    return pd.concat(results, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Percentile-based rightsizing of a synthetic container fleet")
+    parser.add_argument("--containers", type=int, default=10_000, help="Containers to rightsize")
+    parser.add_argument("--days", type=int, default=30, help="Days of 5-minute samples per container")
+    parser.add_argument("--headroom", type=float, default=HEADROOM, help="Headroom over the target percentile")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument("--out", help="Write the recommendations to this CSV file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = rightsize_synthetic(args.containers, args.days, args.seed, args.headroom, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    samples = args.containers * args.days * SAMPLES_PER_DAY
+    print(f"{args.containers:,} containers x {args.days} days ({samples:,} samples per resource) in {elapsed:.1f}s")
+    savings = result["monthly_savings"]
+    print(f"{(savings > 0).sum():,} overprovisioned: ${savings[savings > 0].sum():,.2f}/mo to save; "
+          f"{(savings < 0).sum():,} underprovisioned: ${-savings[savings < 0].sum():,.2f}/mo to add")
+    if args.out:
+        result.drop(columns=["cpu_util", "mem_util", "peak"]).to_csv(args.out, index_label="container")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Branching scenario graph for the Kubecost detective.
+
+Each stage is a JSON file in ``scenarios/`` named after its id. It holds a
+description, an optional Kubecost report (a literal ``data`` table or the
+name of a ``report`` computed from the cluster model) and choices, each
+pointing to the ``next`` stage or to ``end``. ``ScenarioGraph.load`` reads
+every file once to index the stages and validate the graph. Every ``next``
+must exist, every stage must be reachable from the start and able to reach
+the end, there must be no cycles, and some path must score above 0.
+Per-stage metadata (position in topological order, depth, stages remaining,
+choice targets and points) is precomputed, so lookups and progress are O(1)
+however many stages there are.
+A dynamic-programming pass in reverse topological order also precomputes the
+best and worst achievable score, the share of paths reaching each score, and
+a highest-scoring path. Ranking a finished game is then a dictionary lookup.
+Only this structure is kept in memory; a stage's text and report are read
+from its file when ``content`` is called for it.
+
+Usage:
+    python scenario_graph.py [scenarios-dir]
+"""
+import argparse
+import bisect
+import json
+import math
+import os
+import sys
+from collections import deque
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+SCENARIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios")
+START = "stage1"
+END = "end"
+
+
+class ScenarioError(ValueError):
+    """Scenario files that don't form a valid graph"""
+
+    def __init__(self, problems: List[str]):
+        super().__init__("Invalid scenarios:\n  " + "\n  ".join(problems))
+        self.problems = problems
+
+
+class Scores(NamedTuple):
+    best: int  # Highest total a path from the start can score
+    worst: int
+    paths: int  # Distinct paths from the start to the end
+    distribution: Dict[int, float]  # Total score -> % of paths scoring it, ascending
+    best_path: Tuple[Tuple[str, int], ...]  # (stage, choice index) along a highest-scoring path
+    at_or_below: Dict[int, float]  # Total score -> % of paths scoring at most that
+
+
+class Node(NamedTuple):
+    index: int  # Position in topological order (every choice leads to a higher index)
+    depth: int  # Choices from the start on the shortest path there
+    remaining: int  # Stages after this one on the shortest path to the end
+    choices: Tuple[Tuple[str, int], ...]  # (next, points) of each choice, in display order
+
+
+def _read(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _check_stage(stage: str, scenario) -> List[str]:
+    """Problems with one stage file's shape"""
+    if not isinstance(scenario, dict):
+        return [f"{stage}: expected a JSON object"]
+    problems = []
+    if not isinstance(scenario.get("description"), str):
+        problems.append(f"{stage}: missing description")
+    if not isinstance(scenario.get("report", ""), str):
+        problems.append(f"{stage}: report must be a report name")
+    data = scenario.get("data", {})
+    if not isinstance(data, dict) or not all(isinstance(column, list) for column in data.values()):
+        problems.append(f"{stage}: data must map column names to lists")
+    elif len({len(column) for column in data.values()}) > 1:
+        problems.append(f"{stage}: data columns have different lengths")
+    choices = scenario.get("choices")
+    if not isinstance(choices, list) or not choices:
+        return problems + [f"{stage}: needs at least one choice"]
+    for i, choice in enumerate(choices):
+        if not isinstance(choice, dict):
+            problems.append(f"{stage}: choice {i} is not an object")
+            continue
+        for key, kind in (("text", str), ("feedback", str), ("next", str), ("points", int)):
+            if not isinstance(choice.get(key), kind):
+                problems.append(f"{stage}: choice {i} needs {kind.__name__} {key!r}")
+    return problems
+
+
+class ScenarioGraph:
+    """Validated stage graph with precomputed per-stage metadata"""
+
+    def __init__(self, directory: str, start: str, nodes: Dict[str, Node]):
+        self.directory = directory
+        self.start = start
+        self.nodes = nodes
+        self.order = tuple(sorted(nodes, key=lambda stage: nodes[stage].index))
+        self.scores = self._score_paths()
+
+    @classmethod
+    def load(cls, directory: str = SCENARIO_DIR, start: str = START) -> "ScenarioGraph":
+        """Index and validate every ``<stage>.json`` in ``directory``"""
+        problems = []
+        edges = {}
+        for name in sorted(os.listdir(directory)):
+            stage, ext = os.path.splitext(name)
+            if ext != ".json":
+                continue
+            if stage == END:
+                problems.append(f"{name}: {END!r} is reserved for the end of the game")
+                continue
+            try:
+                scenario = _read(os.path.join(directory, name))
+            except (OSError, ValueError) as e:
+                problems.append(f"{name}: {e}")
+                continue
+            stage_problems = _check_stage(stage, scenario)
+            problems += stage_problems
+            if not stage_problems:
+                edges[stage] = tuple((choice["next"], choice["points"]) for choice in scenario["choices"])
+        if start not in edges and not problems:
+            problems.append(f"start stage {start!r} not found")
+        for stage, choices in edges.items():
+            for target, _ in choices:
+                if target != END and target not in edges:
+                    problems.append(f"{stage}: next stage {target!r} does not exist")
+        if problems:
+            raise ScenarioError(problems)
+
+        depth = cls._distances([start], {stage: [t for t, _ in choices] for stage, choices in edges.items()})
+        parents = {}
+        for stage, choices in edges.items():
+            for target, _ in choices:
+                parents.setdefault(target, []).append(stage)
+        remaining = {stage: d - 1 for stage, d in cls._distances([END], parents).items() if stage != END}
+        problems += [f"{stage}: unreachable from {start!r}" for stage in edges if stage not in depth]
+        problems += [f"{stage}: never reaches the end" for stage in edges if stage not in remaining]
+        order = cls._topological_order(edges)
+        if len(order) < len(edges):
+            problems.append("choices form a cycle through: " + ", ".join(sorted(set(edges) - set(order))))
+        if problems:
+            raise ScenarioError(problems)
+        nodes = {
+            stage: Node(index, depth[stage], remaining[stage], edges[stage])
+            for index, stage in enumerate(order)
+        }
+        graph = cls(directory, start, nodes)
+        if graph.scores.best <= 0:
+            # The end screen scales savings by the best score
+            raise ScenarioError([f"the best path scores {graph.scores.best}; at least one path must score above 0"])
+        return graph
+
+    @staticmethod
+    def _distances(sources, neighbours) -> Dict[str, int]:
+        """Breadth-first hop counts from ``sources``"""
+        distance = {source: 0 for source in sources}
+        queue = deque(sources)
+        while queue:
+            stage = queue.popleft()
+            for target in neighbours.get(stage, ()):
+                if target not in distance:
+                    distance[target] = distance[stage] + 1
+                    queue.append(target)
+        return distance
+
+    @staticmethod
+    def _topological_order(edges) -> List[str]:
+        """Stages ordered so every choice leads forward (Kahn's algorithm); cyclic stages are left out"""
+        incoming = dict.fromkeys(edges, 0)
+        for choices in edges.values():
+            for target, _ in choices:
+                if target != END:
+                    incoming[target] += 1
+        queue = deque(stage for stage, count in incoming.items() if count == 0)
+        order = []
+        while queue:
+            stage = queue.popleft()
+            order.append(stage)
+            for target, _ in edges[stage]:
+                if target != END:
+                    incoming[target] -= 1
+                    if incoming[target] == 0:
+                        queue.append(target)
+        return order
+
+    def _score_paths(self) -> Scores:
+        """Score distribution and best path over all paths, by dynamic programming in reverse topological order.
+
+        Each stage keeps the share of its paths to the end scoring each total, as a NumPy
+        array over a grid of the points' greatest common divisor, plus its exact path count.
+        Merging a choice is a shifted, weighted array add, so graphs with astronomically
+        many paths stay cheap.
+        """
+        step = math.gcd(*(points for node in self.nodes.values() for _, points in node.choices)) or 1
+        share = {END: (0, np.ones(1))}  # stage -> (lowest score in steps, share of paths per score)
+        paths = {END: 1}
+        best, worst = {END: (0, None)}, {END: 0}  # Best keeps its choice index
+        for stage in reversed(self.order):
+            choices = self.nodes[stage].choices
+            paths[stage] = sum(paths[target] for target, _ in choices)
+            lo = min(share[target][0] + points // step for target, points in choices)
+            hi = max(share[target][0] + points // step + len(share[target][1]) for target, points in choices)
+            here = np.zeros(hi - lo)
+            for target, points in choices:
+                start = share[target][0] + points // step - lo
+                here[start:start + len(share[target][1])] += share[target][1] * (paths[target] / paths[stage])
+            share[stage] = (lo, here)
+            best[stage] = max((points + best[target][0], -i) for i, (target, points) in enumerate(choices))
+            best[stage] = (best[stage][0], -best[stage][1])
+            worst[stage] = min(points + worst[target] for target, points in choices)
+
+        lo, here = share[self.start]
+        achievable = np.flatnonzero(here)
+        scores = ((lo + achievable) * step).tolist()
+        at_or_below = np.cumsum(here[achievable]) * 100
+        at_or_below[-1] = 100.0
+        best_path, stage = [], self.start
+        while stage != END:
+            choice = best[stage][1]
+            best_path.append((stage, choice))
+            stage = self.nodes[stage].choices[choice][0]
+        return Scores(
+            best[self.start][0], worst[self.start], paths[self.start],
+            dict(zip(scores, (here[achievable] * 100).tolist())), tuple(best_path),
+            dict(zip(scores, at_or_below.tolist())),
+        )
+
+    def percentile(self, score: int) -> float:
+        """% of paths from the start scoring at most ``score``"""
+        at_or_below = self.scores.at_or_below
+        if score in at_or_below:
+            return at_or_below[score]
+        # Not an achievable total (or one too rare to register): use the next lower one
+        scores = list(at_or_below)
+        i = bisect.bisect_left(scores, score)
+        return at_or_below[scores[i - 1]] if i else 0.0
+
+    def __contains__(self, stage: str) -> bool:
+        return stage in self.nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def node(self, stage: str) -> Node:
+        return self.nodes[stage]
+
+    def content(self, stage: str) -> Dict:
+        """Read a stage's description, report and choices from its file"""
+        if stage not in self.nodes:
+            raise KeyError(stage)
+        return _read(os.path.join(self.directory, f"{stage}.json"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the Kubecost detective scenario files")
+    parser.add_argument("directory", nargs="?", default=SCENARIO_DIR, help="Directory of <stage>.json files")
+    parser.add_argument("--start", default=START, help="First stage")
+    args = parser.parse_args()
+
+    try:
+        graph = ScenarioGraph.load(args.directory, args.start)
+    except ScenarioError as e:
+        sys.exit(str(e))
+    for stage in graph.order:
+        node = graph.node(stage)
+        targets = ", ".join(sorted({target for target, _ in node.choices}))
+        print(f"{stage:<20} depth {node.depth:>3}  remaining {node.remaining:>3}  -> {targets}")
+    scores = graph.scores
+    print(f"{len(graph)} stages OK: {scores.paths:,} paths scoring {scores.worst} to {scores.best}")
+    print("Best path: " + " -> ".join(f"{stage}[{choice}]" for stage, choice in scores.best_path))
+
+
+if __name__ == "__main__":
+    main()